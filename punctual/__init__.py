@@ -1,4 +1,9 @@
-from punctual.core import hello_world, punctual, prettify_report, prettify_all_dates_in_dict
+# the legacy core is only imported when one of its functions is actually used
+__all__ = ['hello_world', 'punctual', 'prettify_report', 'prettify_all_dates_in_dict']
 
 
-__all__ = [hello_world, punctual, prettify_report, prettify_all_dates_in_dict]
+def __getattr__(name: str):
+    if name in __all__:
+        from punctual import core
+        return getattr(core, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
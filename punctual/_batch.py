@@ -0,0 +1,107 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+from typing import Union
+
+from punctual.new_core import Schedule
+from punctual.new_core import StandardParser
+from punctual.new_core import new_parser
+
+# GLOBALS (they must not be visible outside this module)
+
+# the parser of the current (worker) process, see '_init_worker'
+_PARSER: Union[StandardParser, None] = None
+
+
+class BatchResult(NamedTuple):
+    # schedules and how long each of them took to compute (in seconds), by entries file
+    schedules: Dict[str, Schedule]
+    timings: Dict[str, float]
+    # how long the whole batch took (in seconds)
+    elapsed: float
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    @property
+    def speedup(self) -> float:
+        # how many schedules were computed at the same time, on average
+        return self.total / self.elapsed if self.elapsed > 0 else 0
+
+
+def _init_worker(usr_synonyms: List[Tuple[str, int]],
+                 online: bool,
+                 contingency_in_minutes: int,
+                 history_files: List[str],
+                 cache_dir: str):
+    # Every worker builds its parser once (synonyms index, local estimator, ...) and reuses it,
+    # along with its parse results, for all the schedules it computes. Remote results are
+    # shared by all workers through the persistent caches in 'cache_dir'
+    global _PARSER
+    _PARSER = new_parser(usr_synonyms=usr_synonyms,
+                         online=online,
+                         contingency_in_minutes=contingency_in_minutes,
+                         history_files=history_files,
+                         cache_dir=cache_dir)
+
+
+def _compute(entries_file: str, tablefmt: str, start_time: datetime) -> Tuple[str, Schedule, float]:
+    start = time.perf_counter()
+    with open(entries_file, 'r') as f:
+        entries = [line.strip() for line in f]
+    schedule: Schedule = Schedule.from_entries(*entries, parser=_PARSER, tablefmt=tablefmt, start=start_time)
+    return entries_file, schedule, time.perf_counter() - start
+
+
+def batch(entries_files: List[str],
+          usr_synonyms: List[Tuple[str, int]],
+          online: bool = False,
+          contingency_in_minutes: int = 2,
+          tablefmt: str = 'default',
+          history_files: List[str] = None,
+          max_workers: int = None,
+          cache_dir: str = None,
+          start_time: datetime = None) -> BatchResult:
+    """
+
+    Args:
+        entries_files: an entries file per schedule, e.g. one per user
+        usr_synonyms: the synonyms shared by all schedules
+        online: whether online services are used, see 'punctual'
+        contingency_in_minutes: see 'punctual'
+        tablefmt: see 'punctual'
+        history_files: past entries files shared by all schedules, see 'punctual'
+        max_workers: how many processes compute schedules at the same time, as many as CPUs by default.
+            With 1, schedules are computed one after the other by the current process
+        cache_dir: the directory of the caches of online services shared by all workers,
+            see 'PersistentCache'
+        start_time: when all schedules start (unless their first entry is fixed), right now by default
+
+    Returns:
+        the schedule of every entries file, with timings
+    """
+    start = time.perf_counter()
+    max_workers = max_workers if max_workers else os.cpu_count() or 1
+    worker_args = (usr_synonyms, online, contingency_in_minutes, history_files, cache_dir)
+    # decided once, so that workers do not depend on their own clock (nor on how they are started)
+    start_time = start_time if start_time else Schedule._now()
+
+    if max_workers == 1:
+        _init_worker(*worker_args)
+        results = [_compute(entries_file, tablefmt, start_time) for entries_file in entries_files]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=worker_args) as executor:
+            # schedules are sent to workers in chunks, to keep the overhead low with many small ones
+            results = list(executor.map(_compute, entries_files, [tablefmt] * len(entries_files),
+                                        [start_time] * len(entries_files),
+                                        chunksize=max(1, len(entries_files) // (4 * max_workers))))
+
+    return BatchResult(schedules={entries_file: schedule for entries_file, schedule, _ in results},
+                       timings={entries_file: elapsed for entries_file, _, elapsed in results},
+                       elapsed=time.perf_counter() - start)
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import time
+from json import dumps
+from json import loads
+from datetime import timedelta
+from threading import Lock
+from typing import Any
+from typing import List
+from typing import Union
+
+# GLOBALS (they must not be visible outside this module)
+
+CACHE_DIR_VARIABLE = 'PUNCTUAL_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'punctual')
+
+
+def cache_dir() -> str:
+    return os.path.expanduser(os.environ.get(CACHE_DIR_VARIABLE, DEFAULT_CACHE_DIR))
+
+
+class PersistentCache:
+    """
+    A key/value store persisted in a SQLite file, so that results of remote calls
+    survive across runs of the program.
+
+    Values must be JSON serializable. Every value expires after 'ttl' and, once the cache
+    holds more than 'max_entries' values, the oldest ones are evicted.
+    """
+
+    def __init__(self,
+                 name: str,
+                 directory: str = None,
+                 ttl: timedelta = timedelta(days=30),
+                 max_entries: int = 10000):
+        self._file = os.path.join(directory if directory else cache_dir(), f'{name}.sqlite3')
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # the connection is opened on first use, and shared by threads
+        self._connection: Union[sqlite3.Connection, None] = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self._file), exist_ok=True)
+            self._connection = sqlite3.connect(self._file, check_same_thread=False)
+            # readers do not wait for writers, e.g. many processes sharing the same cache
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS cache ('
+                                     'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                                     'created REAL NOT NULL, expires REAL NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS cache_created ON cache (created)')
+        return self._connection
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._connect().execute('SELECT value FROM cache WHERE key = ? AND expires > ?',
+                                          (key, time.time())).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return loads(row[0])
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO cache (key, value, created, expires) VALUES (?, ?, ?, ?)',
+                               (key, dumps(value), now, now + self._ttl.total_seconds()))
+            connection.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+            connection.execute('DELETE FROM cache WHERE key IN ('
+                               'SELECT key FROM cache ORDER BY created DESC, rowid DESC LIMIT -1 OFFSET ?)',
+                               (self._max_entries,))
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._connect().execute('SELECT key FROM cache WHERE expires > ?',
+                                                              (time.time(),))]
+
+    def clear(self):
+        with self._lock, self._connect() as connection:
+            connection.execute('DELETE FROM cache')
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM cache WHERE expires > ?',
+                                           (time.time(),)).fetchone()[0]
@@ -0,0 +1,207 @@
+from datetime import datetime
+from datetime import timedelta
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+
+from punctual.new_core import Entry
+from punctual.new_core import Schedule
+from punctual.new_core import SignedTimedelta
+
+# GLOBALS (they must not be visible outside this module)
+
+_DATETIME = 'datetime64[us]'
+_TIMEDELTA = 'timedelta64[us]'
+_ONE_MINUTE = np.timedelta64(1, 'm').astype(_TIMEDELTA)
+_ONE_DAY = np.timedelta64(1, 'D').astype(_TIMEDELTA)
+
+
+def _whole_minutes(between: np.ndarray) -> np.ndarray:
+    # same as 'minutes_between_entries': whole minutes within a day, keeping the sign
+    minutes = (np.abs(between) % _ONE_DAY) // _ONE_MINUTE
+    return (np.sign(between.astype(np.int64)) * minutes).astype('timedelta64[m]').astype(_TIMEDELTA)
+
+
+class ColumnarSchedule:
+    """
+    A read-only, array-backed alternative to Schedule.
+
+    Entries are stored column by column (names, start and end times, durations and
+    whether the start time was fixed by the user), so that timing, spare times,
+    overlaps and totals of many schedules can be computed with vectorized operations.
+    """
+
+    def __init__(self,
+                 names: np.ndarray,
+                 start_times: np.ndarray,
+                 end_times: np.ndarray,
+                 durations: np.ndarray,
+                 fixed: np.ndarray,
+                 tablefmt: str = None,
+                 extras: np.ndarray = None):
+        if not len(names) == len(start_times) == len(end_times) == len(durations) == len(fixed):
+            raise ValueError('Expected all columns to have the same length')
+        if extras is not None and len(extras) != len(names):
+            raise ValueError('Expected all columns to have the same length')
+        self._names = names
+        self._start_times = start_times.astype(_DATETIME)
+        self._end_times = end_times.astype(_DATETIME)
+        self._durations = durations.astype(_TIMEDELTA)
+        self._fixed = fixed.astype(bool)
+        self._tablefmt = tablefmt
+        # the spare time (or overlap) of each entry since the entry it follows, which is not
+        # always the one right before it: by default, the gaps between entries
+        self._extras = extras.astype(_TIMEDELTA) if extras is not None else None
+
+    # CONSTRUCTORS
+
+    @classmethod
+    def from_schedule(cls, schedule: Schedule) -> "ColumnarSchedule":
+        entries: List[Entry] = schedule._entries
+        return cls(np.array([entry.name for entry in entries], dtype=object),
+                   np.array([entry.start_time for entry in entries], dtype=_DATETIME),
+                   np.array([entry.end_time for entry in entries], dtype=_DATETIME),
+                   np.array([entry.duration for entry in entries], dtype=_TIMEDELTA),
+                   np.array([entry.fixed for entry in entries], dtype=bool),
+                   tablefmt=schedule._tablefmt,
+                   extras=np.array([entry._extra for entry in entries], dtype=np.int64).astype(_TIMEDELTA))
+
+    @classmethod
+    def from_parsed(cls,
+                    parsed: Iterable[Tuple[str, timedelta, Union[datetime, None]]],
+                    start: datetime = None,
+                    tablefmt: str = None) -> "ColumnarSchedule":
+        # 'parsed' is made of (name, duration, start) tuples, as returned by any Parser.
+        # Entries are timed just like appending them one by one to a Schedule: every entry
+        # starts when the entry starting last so far ends, unless its start time is fixed
+        parsed = list(parsed)
+        names, durations, starts = zip(*parsed) if parsed else ((), (), ())
+        count = len(parsed)
+        fixed = np.array([s is not None for s in starts], dtype=bool)
+        durations = np.array(durations, dtype=_TIMEDELTA)
+        anchors = np.array([s if s is not None else np.datetime64('NaT') for s in starts], dtype=_DATETIME)
+        elapsed = np.concatenate(([np.timedelta64(0, 'us')], np.cumsum(durations)[:-1])).astype(_TIMEDELTA)
+
+        # every run of entries that are not fixed begins after a fixed entry (or first): its entries
+        # follow each other, the entry starting last so far being always the previous one
+        run_starts = ~fixed
+        run_starts[1:] &= fixed[:-1]
+        run_ends = np.concatenate((np.flatnonzero(~fixed[:-1] & fixed[1:]) + 1, [count]))
+        # a single pass over fixed entries and runs only (not entries) finds where each run begins
+        now = np.datetime64(start if start else Schedule._now(), 'us')
+        last_start = last_end = None
+        run_end = iter(run_ends.tolist())
+        for i in np.flatnonzero(fixed | run_starts).tolist():
+            if fixed[i]:
+                if last_start is None or anchors[i] >= last_start:
+                    last_start, last_end = anchors[i], anchors[i] + durations[i]
+                continue
+            anchors[i] = last_end if last_start is not None else now
+            last = next(run_end) - 1
+            last_start = anchors[i] + (elapsed[last] - elapsed[i])
+            last_end = last_start + durations[last]
+        run_first = np.maximum.accumulate(np.where(run_starts, np.arange(count), 0))
+        start_times = np.where(fixed, anchors, anchors[run_first] + (elapsed - elapsed[run_first]))
+        end_times = start_times + durations
+
+        # the entry each entry follows is the one starting last before it (the latest, on ties)
+        latest_start = np.maximum.accumulate(start_times)
+        became_last = np.ones(count, dtype=bool)
+        became_last[1:] = start_times[1:] >= latest_start[:-1]
+        followed = np.maximum.accumulate(np.where(became_last, np.arange(count), 0))
+        extras = np.zeros(count, dtype=_TIMEDELTA)
+        extras[1:] = _whole_minutes(start_times[1:] - end_times[followed[:-1]])
+
+        # entries sharing the same start_time keep their order, just like Schedule does
+        order = np.argsort(start_times, kind='stable')
+        return cls(np.array(names, dtype=object)[order],
+                   start_times[order],
+                   end_times[order],
+                   durations[order],
+                   fixed[order],
+                   tablefmt=tablefmt,
+                   extras=extras[order])
+
+    # MAGIC METHODS & PROPERTIES
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def names(self) -> np.ndarray:
+        return self._names
+
+    @property
+    def start_times(self) -> np.ndarray:
+        return self._start_times
+
+    @property
+    def end_times(self) -> np.ndarray:
+        return self._end_times
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self._durations
+
+    @property
+    def fixed(self) -> np.ndarray:
+        return self._fixed
+
+    @property
+    def gaps(self) -> np.ndarray:
+        """
+        Time between the end of each entry and the start of the following one, in whole minutes.
+
+        Returns:
+            a timedelta64 array, negative where entries overlap; the first entry has no gap
+        """
+        if self.empty:
+            return np.array([], dtype=_TIMEDELTA)
+        return np.concatenate(([np.timedelta64(0, 'us')],
+                               _whole_minutes(self._start_times[1:] - self._end_times[:-1])))
+
+    @property
+    def extras(self) -> List[SignedTimedelta]:
+        extras = self._extras if self._extras is not None else self.gaps
+        return [SignedTimedelta.from_timedelta(extra) for extra in extras.tolist()]
+
+    @property
+    def minutes(self) -> float:
+        return float(self._durations.sum() / _ONE_MINUTE)
+
+    @property
+    def start(self) -> datetime:
+        self._raise_error_if_empty()
+        return self._start_times[0].item()
+
+    @property
+    def end(self) -> datetime:
+        self._raise_error_if_empty()
+        return self._end_times[-1].item()
+
+    # PRIVATE METHODS
+
+    def _raise_error_if_empty(self):
+        if self.empty:
+            raise IndexError("There are no entries")
+
+    # OTHER USER METHODS
+
+    def to_schedule(self) -> Schedule:
+        result: Schedule = Schedule(tablefmt=self._tablefmt)
+        result._entries = [Entry(*row) for row in zip(self._names.tolist(),
+                                                      self._start_times.tolist(),
+                                                      self._end_times.tolist(),
+                                                      self._durations.tolist(),
+                                                      self.extras,
+                                                      self._fixed.tolist())]
+        result._total_duration = sum(entry._duration for entry in result._entries)
+        result._sources = [None] * len(result._entries)
+        return result
@@ -0,0 +1,136 @@
+from datetime import datetime
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+import numpy as np
+
+from punctual.core import DURATION
+from punctual.core import entry_tokens
+from punctual.core import get_duration
+from punctual.core import parse_duration
+from punctual.core import parse_entry
+from punctual.core import add_synonym_duration
+
+# GLOBALS (they must not be visible outside this module)
+
+COMMENT_SYMBOL = '#'
+
+
+class LocalDurationEstimator:
+    """
+    Estimates the duration of an entry from the entries whose duration is already known,
+    without calling any remote service.
+
+    Every known entry is a TF-IDF vector of its words: the duration of an entry is the one
+    of the most similar known entry, and the (cosine) similarity is the confidence
+    of the estimate, from 0 (no word in common) to 1.
+    """
+
+    def __init__(self):
+        self._vocabulary: Dict[str, int] = {}
+        self._idf: np.ndarray = np.zeros(0, dtype=np.float32)
+        self._vectors: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self._minutes: np.ndarray = np.zeros(0, dtype=np.float32)
+
+    # CONSTRUCTORS
+
+    @classmethod
+    def from_files(cls, *entries_files: str, synonyms: List[Tuple[str, int]] = None) -> "LocalDurationEstimator":
+        samples: List[Tuple[str, float]] = list(synonyms) if synonyms else []
+        for entries_file in entries_files:
+            with open(entries_file, 'r') as f:
+                samples.extend(cls.samples_from_entries([line.strip() for line in f], synonyms))
+        return cls().fit(samples)
+
+    @staticmethod
+    def samples_from_entries(entries: Iterable[str], synonyms: List[Tuple[str, int]] = None) -> List[Tuple[str, float]]:
+        # Past entries whose duration is known, that is:
+        # a synonym, such as "Shower"
+        # a duration labelled by a comment, such as "20m # get up"
+        # a duration along with words, such as "Lunch 30m" (labelled by its words)
+        known = {}
+        for synonym, minutes in synonyms if synonyms else []:
+            add_synonym_duration(synonym, known, minutes)
+        result: List[Tuple[str, float]] = []
+        for entry in entries:
+            if entry.startswith(COMMENT_SYMBOL) or not entry:
+                continue
+            entry, _, label = entry.partition(COMMENT_SYMBOL)
+            try:
+                entry_name, _ = parse_entry(entry.strip(), datetime.now())
+            except ValueError:
+                # e.g. a mistyped start time, such as "Shower; 25:00"
+                continue
+            if label.strip():
+                entry_name, minutes = label.strip(), parse_duration(entry_name)
+            elif parse_duration(entry_name) == 0:
+                minutes = get_duration(entry_name, known)
+            else:
+                # labelled by its other words, a duration alone says nothing about the entry
+                entry_name, minutes = ' '.join(DURATION.sub(' ', entry_name).split()), parse_duration(entry_name)
+                if not entry_name:
+                    continue
+            if minutes > 0:
+                result.append((entry_name, minutes))
+        return result
+
+    # MAGIC METHODS & PROPERTIES
+
+    def __len__(self):
+        return len(self._minutes)
+
+    # PRIVATE METHODS
+
+    def _term_frequencies(self, entry: str) -> np.ndarray:
+        result = np.zeros(len(self._vocabulary), dtype=np.float32)
+        for token in entry_tokens(entry):
+            if token in self._vocabulary:
+                result[self._vocabulary[token]] += 1
+        return result
+
+    def _vector(self, entry: str) -> np.ndarray:
+        result = self._term_frequencies(entry) * self._idf
+        norm = np.linalg.norm(result)
+        return result / norm if norm > 0 else result
+
+    # USER METHODS
+
+    def fit(self, samples: Iterable[Tuple[str, float]]) -> "LocalDurationEstimator":
+        # the same entry may appear many times, with different durations: average them
+        durations: Dict[str, List[float]] = {}
+        for entry, minutes in samples:
+            key = ' '.join(entry_tokens(entry))
+            if key:
+                durations.setdefault(key, []).append(float(minutes))
+
+        self._vocabulary = {token: i for i, token in enumerate(sorted({t for key in durations for t in key.split()}))}
+        self._minutes = np.array([np.mean(minutes) for minutes in durations.values()], dtype=np.float32)
+
+        term_frequencies = np.array([self._term_frequencies(key) for key in durations],
+                                    dtype=np.float32).reshape(len(durations), len(self._vocabulary))
+        document_frequencies = np.count_nonzero(term_frequencies, axis=0)
+        self._idf = (np.log((1 + len(durations)) / (1 + document_frequencies)) + 1).astype(np.float32)
+        vectors = term_frequencies * self._idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        return self
+
+    def estimate(self, entry: str) -> Tuple[float, float]:
+        """
+
+        Args:
+            entry: the name of an entry, such as "Cleaning the kitchen"
+
+        Returns:
+            a tuple where:
+                first item is the estimated duration in minutes
+                second item is the confidence of the estimate, from 0 to 1
+        """
+        if len(self) == 0:
+            return 0, 0
+        similarities = self._vectors @ self._vector(entry)
+        nearest = int(np.argmax(similarities))
+        # rounding errors may slightly exceed the bounds
+        return float(self._minutes[nearest]), float(np.clip(similarities[nearest], 0, 1))
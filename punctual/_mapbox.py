@@ -2,10 +2,22 @@ from functools import lru_cache
 from datetime import timedelta
 from typing import List
 from typing import Tuple
+from typing import Union
 from urllib.parse import quote
 from enum import Enum
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from punctual._cache import PersistentCache
+
+# GLOBALS (they must not be visible outside this module)
+
+TIMEOUT_IN_SECONDS = 10
+MAPBOX_API_URL = 'https://api.mapbox.com'
+# how many coordinates a single Matrix API request may contain
+MAX_MATRIX_COORDINATES = 25
 
 
 class RoutingProfile(Enum):
@@ -15,19 +27,64 @@ class RoutingProfile(Enum):
     CYCLING = 'cycling'
 
 
+def new_session(pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.3) -> requests.Session:
+    """
+
+    Args:
+        pool_size: the maximum number of connections kept alive
+        retries: how many times a failed request is retried
+        backoff_factor: how long to wait between retries, it grows exponentially
+
+    Returns:
+        a session reusing its connections across requests
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size,
+                          pool_maxsize=pool_size,
+                          max_retries=Retry(total=retries,
+                                            backoff_factor=backoff_factor,
+                                            status_forcelist=(429, 500, 502, 503, 504),
+                                            allowed_methods=('GET',)))
+    result = requests.Session()
+    result.mount('https://', adapter)
+    result.mount('http://', adapter)
+    result.headers.update({"User-Agent": "punctual/1.0.0"})
+    return result
+
+
+def location_key(location: str) -> str:
+    return ' '.join(location.lower().split())
+
+
+def direction_key(locations: List[Tuple[float, float]], routing_profile: RoutingProfile) -> str:
+    return f'{routing_profile.value}:' + ';'.join(f'{longitude},{latitude}' for longitude, latitude in locations)
+
+
 def direction_duration(locations: List[Tuple[float, float]],
                        routing_profile: RoutingProfile,
-                       token: str) -> timedelta:
+                       token: str,
+                       cache: PersistentCache = None,
+                       session: requests.Session = None,
+                       timeout: float = TIMEOUT_IN_SECONDS,
+                       base_url: str = MAPBOX_API_URL) -> timedelta:
     """
 
     Args:
         locations: a list of coordinates (longitude and latitude) that compose the trip
         routing_profile: specify if the user is driving, walking or cycling
         token: the mapbox token to use
+        cache: if provided, durations are looked up here first and stored here afterwards
+        session: if provided, the request reuses its connections
+        timeout: how many seconds to wait for Mapbox to answer
+        base_url: where the Mapbox API is served
 
     Returns:
 
     """
+    if cache is not None:
+        cached_seconds = cache.get(direction_key(locations, routing_profile))
+        if cached_seconds is not None:
+            return timedelta(seconds=cached_seconds)
+
     if 0 > len(locations) > 2:
         raise ValueError('This method calculates the travel time between two locations. However, the input does not '
                          'include the required locations')
@@ -37,7 +94,7 @@ def direction_duration(locations: List[Tuple[float, float]],
     #    coordinates_concat = ','.join([str(coordinate) for coordinate in locations[location]])
     quoted_coordinates = quote(f'{locations[0][0]},{locations[0][1]};{locations[1][0]},{locations[1][1]}')
 
-    url = f"https://api.mapbox.com/directions/v5/mapbox/{routing_profile.value}/{quoted_coordinates}"
+    url = f"{base_url}/directions/v5/mapbox/{routing_profile.value}/{quoted_coordinates}"
     querystring = {"alternatives": "false", "geometries": "geojson", "overview": "full", "steps": "false",
                    "notifications": "none",
                    "access_token": token}
@@ -45,34 +102,95 @@ def direction_duration(locations: List[Tuple[float, float]],
     headers = {"User-Agent": "punctual/1.0.0"}
 
     try:
-        response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
+        response = (session if session else requests).request(
+            "GET", url, data=payload, headers=headers, params=querystring, timeout=timeout)
         #response.json()['routes'][0]['distance'] / 1000 => distance in km
-        return timedelta(minutes=round(response.json()['routes'][0]['duration']) / 60)
+        result = timedelta(minutes=round(response.json()['routes'][0]['duration']) / 60)
     # TODO remove this bare 'except', we can handle exception way better
     except:
         return timedelta(minutes=0)
 
+    # failures are never cached
+    if cache is not None:
+        cache.set(direction_key(locations, routing_profile), result.total_seconds())
+    return result
+
+
+def duration_matrix(locations: List[Tuple[float, float]],
+                    routing_profile: RoutingProfile,
+                    token: str,
+                    session: requests.Session = None,
+                    timeout: float = TIMEOUT_IN_SECONDS,
+                    base_url: str = MAPBOX_API_URL) -> List[List[Union[timedelta, None]]]:
+    """
+
+    Args:
+        locations: a list of coordinates (longitude and latitude), at most MAX_MATRIX_COORDINATES
+        routing_profile: specify if the user is driving, walking or cycling
+        token: the mapbox token to use
+        session: if provided, the request reuses its connections
+        timeout: how many seconds to wait for Mapbox to answer
+        base_url: where the Mapbox API is served
+
+    Returns:
+        the travel time from every location (row) to every location (column), all with a single request.
+        A travel time is None when Mapbox could not find a route
+    """
+    if not 2 <= len(locations) <= MAX_MATRIX_COORDINATES:
+        raise ValueError(f'Expected from 2 to {MAX_MATRIX_COORDINATES} locations, got {len(locations)}')
+
+    quoted_coordinates = quote(';'.join(f'{longitude},{latitude}' for longitude, latitude in locations))
+
+    url = f"{base_url}/directions-matrix/v1/mapbox/{routing_profile.value}/{quoted_coordinates}"
+    querystring = {"annotations": "duration", "access_token": token}
+    headers = {"User-Agent": "punctual/1.0.0"}
+
+    response = (session if session else requests).request(
+        "GET", url, headers=headers, params=querystring, timeout=timeout)
+    return [[timedelta(minutes=round(seconds) / 60) if seconds is not None else None for seconds in row]
+            for row in response.json()['durations']]
+
 
 @lru_cache
 def geocode(location: str,
-            token: str) -> Tuple[str, Tuple[float, float]]:
+            token: str,
+            cache: PersistentCache = None,
+            session: requests.Session = None,
+            timeout: float = TIMEOUT_IN_SECONDS,
+            base_url: str = MAPBOX_API_URL) -> Tuple[str, Tuple[float, float]]:
     """
 
     Args:
         location: a string representing an address or a location, such as "Piazza della Repubblica, Rome, Italy"
         token: the mapbox token to use
+        cache: if provided, locations are looked up here first and stored here afterwards
+        session: if provided, the request reuses its connections
+        timeout: how many seconds to wait for Mapbox to answer
+        base_url: where the Mapbox API is served
 
     Returns:
         a tuple where:
             first item is the full address name matched by mapbox
             second item is a tuple of coordinates (longitude and latitude)
     """
+    if cache is not None:
+        cached = cache.get(location_key(location))
+        if cached is not None:
+            place_name, (longitude, latitude) = cached
+            return place_name, (longitude, latitude)
+
     url = \
-        f'https://api.mapbox.com/geocoding/v5/mapbox.places/{quote(location)}.json'
+        f'{base_url}/geocoding/v5/mapbox.places/{quote(location)}.json'
     querystring = {"access_token": token}
     payload = ""
     headers = {"User-Agent": "punctual/1.0.0"}
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    return (response.json()['features'][0]['place_name'],  # full address
-            (response.json()['features'][0]['center'][0],  # longitude
-            response.json()['features'][0]['center'][1]))  # latitude
+    response = (session if session else requests).request(
+        "GET", url, data=payload, headers=headers, params=querystring, timeout=timeout)
+    feature = response.json()['features'][0]
+    result = (feature['place_name'],  # full address
+              (feature['center'][0],  # longitude
+               feature['center'][1]))  # latitude
+
+    if cache is not None:
+        cache.set(location_key(location), result)
+    return result
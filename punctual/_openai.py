@@ -1,21 +1,157 @@
+from collections import Counter
+from json import dumps
 from json import loads
 from datetime import timedelta
+from functools import cached_property
+from functools import lru_cache
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Union
 
 from openai import OpenAI
 
+from punctual._cache import PersistentCache
+from punctual.core import entry_tokens
 
-def guess_duration(entry: str, token: str) -> timedelta:
-    client = OpenAI(api_key=token)
+# GLOBALS (they must not be visible outside this module)
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
+# activities the AI compares entries to, with their durations in minutes
+SAMPLE_DATABASE = {
+    'Grocery': 25,
+    'Parking': 15,
+    'Cooking': 12,
+    'Meal': 12,
+    'Clean': 10,
+    'Breakfast': 10,
+    'Lunch': 10,
+    'Dinner': 10,
+    'Shower': 20,
+    'Shaving': 15,
+    'Get dressed': 15,
+}
+# what both system prompts have in common, the sample database included
+INSTRUCTIONS = ('You are provided with a sample database containing activities and their respective durations '
+                'in minutes. For example, "Having lunch, 20". Your task is to estimate the duration in minutes for {}'
+                '\n\nSample database\n' + '\n'.join(f'{activity}: {minutes} minutes'
+                                                  for activity, minutes in SAMPLE_DATABASE.items()))
+# the system prompt to guess the duration of a single entry
+GUESS_PROMPT = INSTRUCTIONS.format(
+    'any given entry that is not listed in the sample database and output the result in a JSON file. '
+    'Avoid any discussion, suggestions, or comments\n\n'
+    'Input Example:\n"Having lunch"\n\n'
+    'Output Example:\n{ "duration": 20 }')
+# the system prompt to guess the durations of many entries at once
+GUESSES_PROMPT = INSTRUCTIONS.format(
+    'every entry of a given JSON list, none of them is listed in the sample database, and output the results '
+    'in a JSON file mapping every entry (exactly as given) to its duration. '
+    'Avoid any discussion, suggestions, or comments\n\n'
+    'Input Example:\n["Having lunch", "Cleaning the kitchen"]\n\n'
+    'Output Example:\n{ "durations": { "Having lunch": 20, "Cleaning the kitchen": 10 } }')
+# the options of every request, along with the messages
+REQUEST_OPTIONS = {
+    'model': 'gpt-4o',
+    'temperature': 1,
+    'top_p': 1,
+    'response_format': {'type': 'json_object'},
+    'frequency_penalty': 0,
+    'presence_penalty': 0,
+}
+# how many tokens an answer about a single entry takes at most
+MAX_TOKENS = 256
+
+
+class GuessCache:
+    """
+    Durations guessed by the AI, persisted across runs.
+
+    Entries are looked up by their meaningful words, so that "Cleaning kitchen" and
+    "cleaning the kitchen" share the same guess. With 'similarity' below 1, an entry
+    also matches a cached one sharing at least that fraction of words.
+    """
+
+    def __init__(self, cache: PersistentCache, similarity: float = 1):
+        self._cache = cache
+        self._similarity = similarity
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(entry: str) -> str:
+        return ' '.join(sorted(set(entry_tokens(entry))))
+
+    @cached_property
+    def _keys_by_word(self) -> Dict[str, Set[str]]:
+        # the cached keys containing each word, read once on the first approximate lookup
+        # and kept up to date by 'set'
+        result: Dict[str, Set[str]] = {}
+        for key in self._cache.keys():
+            self._index(key, result)
+        return result
+
+    @staticmethod
+    def _index(key: str, keys_by_word: Dict[str, Set[str]]):
+        for word in key.split():
+            keys_by_word.setdefault(word, set()).add(key)
+
+    def _similar_key(self, key: str) -> Union[str, None]:
+        words = set(key.split())
+        if not words:
+            return None
+        # only keys sharing at least a word are worth comparing
+        shared: Counter = Counter(candidate for word in words for candidate in self._keys_by_word.get(word, ()))
+        best_key, best_similarity = None, self._similarity
+        for candidate, count in shared.items():
+            # Jaccard similarity of the words (keys are made of unique words)
+            similarity = count / (len(words) + len(candidate.split()) - count)
+            if similarity >= best_similarity:
+                best_key, best_similarity = candidate, similarity
+        return best_key
+
+    def get(self, entry: str) -> Union[timedelta, None]:
+        key = self.key(entry)
+        minutes = self._cache.get(key)
+        if minutes is None and self._similarity < 1:
+            similar_key = self._similar_key(key)
+            minutes = self._cache.get(similar_key) if similar_key else None
+        if minutes is None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        return timedelta(minutes=minutes)
+
+    def set(self, entry: str, duration: timedelta):
+        key = self.key(entry)
+        self._cache.set(key, duration.total_seconds() / 60)
+        if '_keys_by_word' in self.__dict__:
+            self._index(key, self._keys_by_word)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+@lru_cache
+def client(token: str) -> OpenAI:
+    # a client keeps its connections alive, share it across requests
+    return OpenAI(api_key=token)
+
+
+def guess_duration(entry: str, token: str, cache: GuessCache = None, openai_client: OpenAI = None) -> timedelta:
+    if cache is not None:
+        cached = cache.get(entry)
+        if cached is not None:
+            return cached
+
+    response = (openai_client if openai_client else client(token)).chat.completions.create(
         messages=[
             {
                 "role": "system",
                 "content": [
                     {
                         "type": "text",
-                        "text": "You are provided with a sample database containing activities and their respective durations in minutes. For example, \"Having lunch, 20\". Your task is to estimate the duration in minutes for any given entry that is not listed in the sample database and output the result in a JSON file. Avoid any discussion, suggestions, or comments\n\nInput Example:\n\"Having lunch\"\n\nOutput Example:\n{ \"duration\": 20 }\n\nSample database\nGrocery: 25 minutes\nParking: 15 minutes\nCooking: 12 minutes\nMeal: 12 minutes\nClean: 10 minutes\nBreakfast: 10 minutes\nLunch: 10 minutes\nDinner: 10 minutes\nShower: 20 minutes\nShaving: 15 minutes\nGet dressed: 15 minutes"
+                        "text": GUESS_PROMPT
                     }
                 ]
             },
@@ -47,12 +183,75 @@ def guess_duration(entry: str, token: str) -> timedelta:
                 ]
             }
         ],
-        temperature=1,
-        max_tokens=256,
-        top_p=1,
-        response_format={"type": "json_object"},
-        frequency_penalty=0,
-        presence_penalty=0
+        max_tokens=MAX_TOKENS,
+        **REQUEST_OPTIONS
+    )
+
+    result = timedelta(minutes=(loads(response.choices[0].message.content)['duration']))
+
+    if cache is not None:
+        cache.set(entry, result)
+    return result
+
+
+def guess_durations(entries: List[str],
+                    token: str,
+                    cache: GuessCache = None,
+                    openai_client: OpenAI = None) -> Dict[str, timedelta]:
+    """
+
+    Args:
+        entries: the entries whose duration is unknown
+        token: the openai token to use
+        cache: if provided, guesses are looked up here first and stored here afterwards
+        openai_client: if provided, the client sending the request
+
+    Returns:
+        the guessed duration of every entry, all of them asked with a single request.
+        Entries the AI did not answer about are missing
+    """
+    result: Dict[str, timedelta] = {}
+    unknown: List[str] = []
+    for entry in dict.fromkeys(entries):
+        cached = cache.get(entry) if cache is not None else None
+        if cached is not None:
+            result[entry] = cached
+        else:
+            unknown.append(entry)
+
+    if len(unknown) == 0:
+        return result
+
+    response = (openai_client if openai_client else client(token)).chat.completions.create(
+        messages=[
+            {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": GUESSES_PROMPT
+                    }
+                ]
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": dumps(unknown)
+                    }
+                ]
+            }
+        ],
+        # every entry needs a few tokens in the answer
+        max_tokens=MAX_TOKENS + 32 * len(unknown),
+        **REQUEST_OPTIONS
     )
 
-    return timedelta(minutes=(loads(response.choices[0].message.content)['duration']))
+    durations: dict = loads(response.choices[0].message.content).get('durations', {})
+    for entry in unknown:
+        if isinstance(durations.get(entry), (int, float)):
+            result[entry] = timedelta(minutes=durations[entry])
+            if cache is not None:
+                cache.set(entry, result[entry])
+    return result
@@ -0,0 +1,195 @@
+import math
+import re
+from datetime import timedelta
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Union
+
+from punctual.new_core import Entry
+from punctual.new_core import SignedTimedelta
+
+# GLOBALS (they must not be visible outside this module)
+
+# same as tabulate: headers are at least this much wider than their text
+MIN_PADDING = 2
+MICROSECONDS_PER_MINUTE = 60000000
+MINUTES_PER_DAY = 1440
+# same as tabulate, e.g. "1,000" or "-1,000.5"
+NUMBER_WITH_THOUSANDS_SEPARATORS = re.compile(r'^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$')
+
+
+class Line(NamedTuple):
+    begin: str
+    fill: str
+    separator: str
+    end: str
+
+
+class Row(NamedTuple):
+    begin: str
+    separator: str
+    end: str
+
+
+class TableFormat(NamedTuple):
+    # the same styles as tabulate, when a table has headers
+    above: Union[Line, None]
+    below_headers: Union[Line, None]
+    between_rows: Union[Line, None]
+    below: Union[Line, None]
+    row: Row
+    padding: int
+
+
+TABLE_FORMATS: Dict[str, TableFormat] = {
+    'plain': TableFormat(None, None, None, None, Row('', '  ', ''), 0),
+    'simple': TableFormat(None, Line('', '-', '  ', ''), None, None, Row('', '  ', ''), 0),
+    'github': TableFormat(None, Line('|', '-', '|', '|'), None, None, Row('|', '|', '|'), 1),
+    'grid': TableFormat(Line('+', '-', '+', '+'), Line('+', '=', '+', '+'), Line('+', '-', '+', '+'),
+                        Line('+', '-', '+', '+'), Row('|', '|', '|'), 1),
+    'simple_grid': TableFormat(Line('┌', '─', '┬', '┐'), Line('├', '─', '┼', '┤'), Line('├', '─', '┼', '┤'),
+                               Line('└', '─', '┴', '┘'), Row('│', '│', '│'), 1),
+    'rounded_grid': TableFormat(Line('╭', '─', '┬', '╮'), Line('├', '─', '┼', '┤'), Line('├', '─', '┼', '┤'),
+                                Line('╰', '─', '┴', '╯'), Row('│', '│', '│'), 1),
+    'fancy_grid': TableFormat(Line('╒', '═', '╤', '╕'), Line('╞', '═', '╪', '╡'), Line('├', '─', '┼', '┤'),
+                              Line('╘', '═', '╧', '╛'), Row('│', '│', '│'), 1),
+    'outline': TableFormat(Line('+', '-', '+', '+'), Line('+', '=', '+', '+'), None,
+                           Line('+', '-', '+', '+'), Row('|', '|', '|'), 1),
+    'simple_outline': TableFormat(Line('┌', '─', '┬', '┐'), Line('├', '─', '┼', '┤'), None,
+                                  Line('└', '─', '┴', '┘'), Row('│', '│', '│'), 1),
+    'psql': TableFormat(Line('+', '-', '+', '+'), Line('|', '-', '+', '|'), None,
+                        Line('+', '-', '+', '+'), Row('|', '|', '|'), 1),
+    'orgtbl': TableFormat(None, Line('|', '-', '+', '|'), None, None, Row('|', '|', '|'), 1),
+    'presto': TableFormat(None, Line('', '-', '+', ''), None, None, Row('', '|', ''), 1),
+}
+
+
+def _is_number(value: str) -> bool:
+    # same as tabulate: numbers may have thousands separators (e.g. "1,000"),
+    # but numbers too large to be anything but infinite are text
+    if NUMBER_WITH_THOUSANDS_SEPARATORS.match(value):
+        return True
+    try:
+        number = float(value)
+    except ValueError:
+        return False
+    return not (math.isinf(number) or math.isnan(number)) or value.lower() in ('inf', '-inf', 'nan')
+
+
+def _is_number_or_bool(value: str) -> bool:
+    # what makes tabulate align (and possibly reformat) a column as numbers rather than as text
+    return value in ('True', 'False') or _is_number(value)
+
+
+def is_supported(names: List[str], tablefmt: str = None) -> bool:
+    """
+    Whether a table of entries with these names is rendered exactly as tabulate would.
+    Otherwise, e.g. with wide characters or names that are all numbers, leave it to tabulate.
+    """
+    tablefmt = tablefmt if tablefmt else 'default'
+    if tablefmt != 'default' and tablefmt not in TABLE_FORMATS:
+        return False
+    for name in names:
+        lines = name.split('\n')
+        # unknown formats (such as 'default') are 'simple' without multiline cells
+        if not name.isascii() or (tablefmt == 'default' and len(lines) > 1):
+            return False
+        # e.g. tabs
+        if not all(line.isprintable() for line in lines):
+            return False
+    return not names or any(name.strip() and not _is_number_or_bool(name.strip()) for name in names)
+
+
+class ReportRenderer:
+    """
+    Renders a schedule report just like 'prettify_report' would, straight from its entries:
+    cells are formatted once, column widths are known after a single pass and the table is
+    rendered line by line.
+    """
+
+    HEADERS = Entry.FIELDS
+
+    def __init__(self, tablefmt: str = None):
+        self._format: TableFormat = TABLE_FORMATS.get(tablefmt, TABLE_FORMATS['simple'])
+        # schedules are made of a few distinct durations, format each of them once
+        self._durations: Dict[int, str] = {}
+        self._extras: Dict[int, str] = {}
+
+    # PRIVATE METHODS
+
+    @staticmethod
+    def _time(microseconds: int) -> str:
+        # same as 'prettify_date', entries being timed from a midnight
+        minutes = microseconds // MICROSECONDS_PER_MINUTE % MINUTES_PER_DAY
+        return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+    def _duration(self, microseconds: int) -> str:
+        if microseconds not in self._durations:
+            self._durations[microseconds] = str(timedelta(microseconds=microseconds))
+        return self._durations[microseconds]
+
+    def _extra(self, microseconds: int) -> str:
+        if microseconds not in self._extras:
+            self._extras[microseconds] = str(SignedTimedelta.from_timedelta(timedelta(microseconds=microseconds)))
+        return self._extras[microseconds]
+
+    def _cells(self, entry: Entry) -> List[str]:
+        return [entry.name.strip(), self._time(entry._start), self._time(entry._end),
+                self._duration(entry._duration), self._extra(entry._extra), str(entry.fixed)]
+
+    def _line(self, line: Line, widths: List[int]) -> str:
+        padding = 2 * self._format.padding
+        # same as tabulate, there is never any trailing whitespace
+        return (line.begin + line.separator.join(line.fill * (width + padding) for width in widths) + line.end).rstrip()
+
+    def _row_template(self, widths: List[int]) -> str:
+        row = self._format.row
+        pad = ' ' * self._format.padding
+        return row.begin + row.separator.join(f'{pad}{{:<{width}}}{pad}' for width in widths) + row.end
+
+    @staticmethod
+    def _rows(template: str, cells: List[str]) -> Iterator[str]:
+        # only names may be made of many lines (e.g. trips)
+        if '\n' not in cells[0]:
+            yield template.format(*cells).rstrip()
+            return
+        names = cells[0].split('\n')
+        yield template.format(names[0], *cells[1:]).rstrip()
+        for name in names[1:]:
+            yield template.format(name, *([''] * (len(cells) - 1))).rstrip()
+
+    # USER METHODS
+
+    def table(self, entries: Iterable[Entry]) -> Iterator[str]:
+        rows: List[List[str]] = [self._cells(entry) for entry in entries]
+        widths: List[int] = [len(header) + MIN_PADDING for header in self.HEADERS]
+        for cells in rows:
+            for i, cell in enumerate(cells):
+                width = len(cell) if i > 0 or '\n' not in cell else max(len(line) for line in cell.split('\n'))
+                if width > widths[i]:
+                    widths[i] = width
+
+        table_format = self._format
+        template = self._row_template(widths)
+        if table_format.above:
+            yield self._line(table_format.above, widths)
+        yield from self._rows(template, list(self.HEADERS))
+        if table_format.below_headers:
+            yield self._line(table_format.below_headers, widths)
+        between_rows = self._line(table_format.between_rows, widths) if table_format.between_rows else None
+        for i, cells in enumerate(rows):
+            if i > 0 and between_rows:
+                yield between_rows
+            yield from self._rows(template, cells)
+        if table_format.below:
+            yield self._line(table_format.below, widths)
+
+    def report(self, entries: List[Entry], minutes: float) -> Iterator[str]:
+        yield ''
+        yield f'Total time required: {round(minutes)} minutes'
+        yield f'From {self._time(entries[0]._start)} to {self._time(entries[-1]._end)}'
+        yield from self.table(entries)
+        yield ''
@@ -0,0 +1,142 @@
+import csv
+from datetime import datetime
+from datetime import timedelta
+from json import dumps
+from json import loads
+from operator import attrgetter
+from typing import BinaryIO
+from typing import Iterable
+from typing import List
+from typing import TextIO
+from typing import Union
+
+from punctual.new_core import Entry
+from punctual.new_core import Schedule
+
+# GLOBALS (they must not be visible outside this module)
+
+MICROSECONDS_PER_SECOND = 1000000
+
+# Dates are ISO 8601 strings, durations and extra times are (signed) seconds:
+# every format holds exactly what an Entry holds, so nothing is parsed again when loading
+
+
+def _iso(microseconds: int) -> str:
+    return (Entry.EPOCH + timedelta(microseconds=microseconds)).isoformat()
+
+
+def _microseconds(iso: str) -> int:
+    elapsed: timedelta = datetime.fromisoformat(iso) - Entry.EPOCH
+    return (elapsed.days * 86400 + elapsed.seconds) * MICROSECONDS_PER_SECOND + elapsed.microseconds
+
+
+def _seconds(microseconds: int) -> float:
+    return microseconds / MICROSECONDS_PER_SECOND
+
+
+def _from_seconds(seconds: Union[str, float]) -> int:
+    return round(float(seconds) * MICROSECONDS_PER_SECOND)
+
+
+def _schedule(entries: List[Entry], tablefmt: str = None) -> Schedule:
+    result: Schedule = Schedule(tablefmt=tablefmt)
+    # streamed entries are dumped as they come, not always ordered by start time
+    entries.sort(key=attrgetter('_start'))
+    result._entries = entries
+    result._sources = [None] * len(entries)
+    result._total_duration = sum(entry._duration for entry in entries)
+    return result
+
+
+# JSON LINES
+
+
+def dump_jsonl(entries: Iterable[Entry], file: TextIO):
+    """Write one JSON object per entry, as soon as it comes (e.g. from 'Schedule.stream')."""
+    for entry in entries:
+        file.write(f'{{"name": {dumps(entry.name)}, '
+                   f'"start_time": "{_iso(entry._start)}", '
+                   f'"end_time": "{_iso(entry._end)}", '
+                   f'"duration": {_seconds(entry._duration)}, '
+                   f'"extra": {_seconds(entry._extra)}, '
+                   f'"fixed": {"true" if entry.fixed else "false"}}}\n')
+
+
+def load_jsonl(file: TextIO, tablefmt: str = None) -> Schedule:
+    entries: List[Entry] = []
+    for line in file:
+        if not line.strip():
+            continue
+        row: dict = loads(line)
+        entries.append(Entry._make((row['name'],
+                                    _microseconds(row['start_time']),
+                                    _microseconds(row['end_time']),
+                                    _from_seconds(row['duration']),
+                                    _from_seconds(row['extra']),
+                                    row['fixed'])))
+    return _schedule(entries, tablefmt)
+
+
+# CSV
+
+
+def dump_csv(entries: Iterable[Entry], file: TextIO):
+    """Write a header and one row per entry, as soon as it comes (e.g. from 'Schedule.stream')."""
+    writer = csv.writer(file)
+    writer.writerow(Entry.FIELDS)
+    writer.writerows((entry.name, _iso(entry._start), _iso(entry._end),
+                      _seconds(entry._duration), _seconds(entry._extra), entry.fixed) for entry in entries)
+
+
+def load_csv(file: TextIO, tablefmt: str = None) -> Schedule:
+    reader = csv.reader(file)
+    if next(reader, None) is None:
+        return _schedule([], tablefmt)
+    entries: List[Entry] = [Entry._make((name,
+                                         _microseconds(start_time),
+                                         _microseconds(end_time),
+                                         _from_seconds(duration),
+                                         _from_seconds(extra),
+                                         fixed == 'True'))
+                            for name, start_time, end_time, duration, extra, fixed in reader]
+    return _schedule(entries, tablefmt)
+
+
+# COLUMNAR
+
+
+def dump_npz(entries: Iterable[Entry], file: Union[str, BinaryIO]):
+    """
+    Write entries column by column to a compressed numpy archive: times and durations
+    as 64-bit integers (microseconds) and names as a single UTF-8 buffer with their lengths.
+    """
+    # numpy is only needed by the columnar format
+    import numpy as np
+
+    entries = entries if isinstance(entries, list) else list(entries)
+    count = len(entries)
+    names: List[bytes] = [entry.name.encode('utf-8') for entry in entries]
+    np.savez_compressed(file,
+                        names=np.frombuffer(b''.join(names), dtype=np.uint8),
+                        name_lengths=np.fromiter(map(len, names), dtype=np.int64, count=count),
+                        start_times=np.fromiter((entry._start for entry in entries), dtype=np.int64, count=count),
+                        end_times=np.fromiter((entry._end for entry in entries), dtype=np.int64, count=count),
+                        durations=np.fromiter((entry._duration for entry in entries), dtype=np.int64, count=count),
+                        extras=np.fromiter((entry._extra for entry in entries), dtype=np.int64, count=count),
+                        fixed=np.fromiter((entry.fixed for entry in entries), dtype=bool, count=count))
+
+
+def load_npz(file: Union[str, BinaryIO], tablefmt: str = None) -> Schedule:
+    import numpy as np
+
+    with np.load(file, allow_pickle=False) as columns:
+        buffer: bytes = columns['names'].tobytes()
+        ends: List[int] = np.cumsum(columns['name_lengths']).tolist()
+        starts: List[int] = [0] + ends[:-1]
+        entries: List[Entry] = [Entry._make((buffer[start:end].decode('utf-8'), *row))
+                                for start, end, row in zip(starts, ends, zip(columns['start_times'].tolist(),
+                                                                             columns['end_times'].tolist(),
+                                                                             columns['durations'].tolist(),
+                                                                             columns['extras'].tolist(),
+                                                                             columns['fixed'].tolist()))]
+    return _schedule(entries, tablefmt)
@@ -0,0 +1,92 @@
+from bisect import bisect_left
+from bisect import insort
+from collections import Counter
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Union
+
+from punctual.core import ParsedEntry
+
+# GLOBALS (they must not be visible outside this module)
+
+# shorter entries, such as "s", are the beginning of too many synonyms to mean any of them
+MIN_PREFIX_LENGTH = 3
+
+
+def trigrams(key: str) -> Set[str]:
+    # padded, so that the beginning and the end of a word count too
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SynonymIndex(dict):
+    """
+    Synonyms by key (see 'ParsedEntry.key'), as expected by 'add_synonym_duration' and
+    'get_parsed_duration', indexed to also find synonyms approximately matching an entry.
+
+    An entry matches a synonym approximately when its whole words are the beginning of exactly
+    one synonym, such as "getting ready" for "getting ready to go out" (but not "get" nor "s"),
+    or when their trigrams are similar enough, such as "showers" for "shower". Trips only match
+    exactly (whatever the order of their locations).
+    """
+
+    def __init__(self, similarity: float = 0.6):
+        super().__init__()
+        self._similarity = similarity
+        # all keys, sorted to find them by prefix
+        self._keys: List[str] = []
+        # the keys containing each trigram
+        self._trigrams: Dict[str, Set[str]] = {}
+        # how many trigrams each key has
+        self._sizes: Dict[str, int] = {}
+
+    @classmethod
+    def from_dict(cls, synonyms: dict, similarity: float = 0.6) -> "SynonymIndex":
+        result = cls(similarity=similarity)
+        for key, value in synonyms.items():
+            result[key] = value
+        return result
+
+    def __setitem__(self, key: str, value: dict):
+        if key not in self:
+            insort(self._keys, key)
+            key_trigrams = trigrams(key)
+            for trigram in key_trigrams:
+                self._trigrams.setdefault(trigram, set()).add(key)
+            self._sizes[key] = len(key_trigrams)
+        super().__setitem__(key, value)
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        start = bisect_left(self._keys, prefix)
+        end = start
+        while end < len(self._keys) and self._keys[end].startswith(prefix):
+            end = end + 1
+        return self._keys[start:end]
+
+    def closest(self, key: str) -> Union[str, None]:
+        if key in self:
+            return key
+        # the entry must be made of whole words of the synonym
+        candidates = [candidate for candidate in self.with_prefix(key) if candidate[len(key)] == ' '] \
+            if len(key) >= MIN_PREFIX_LENGTH else []
+        if len(candidates) == 1:
+            return candidates[0]
+        key_trigrams = trigrams(key)
+        shared: Counter = Counter(candidate for trigram in key_trigrams
+                                  for candidate in self._trigrams.get(trigram, ()))
+        best_key, best_similarity = None, self._similarity
+        for candidate, count in shared.items():
+            # Jaccard similarity of the trigrams
+            similarity = count / (len(key_trigrams) + self._sizes[candidate] - count)
+            if similarity >= best_similarity:
+                best_key, best_similarity = candidate, similarity
+        return best_key
+
+    def duration(self, entry: ParsedEntry) -> int:
+        # the key of the entry is computed once
+        key = entry.key
+        # places are not near-misses of each other (e.g. "Rome" and "Romania"): trips match exactly
+        if not entry.is_direction:
+            key = self.closest(key)
+        return self[key]['duration'] if key in self else 0
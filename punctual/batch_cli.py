@@ -0,0 +1,104 @@
+import argparse
+import os
+from typing import List
+
+from punctual.cli import parse_synonyms_file
+
+# The entry point computing many schedules at once, e.g.
+# 'python -m punctual.batch_cli alice.txt bob.txt --synonyms_file synonyms.txt'.
+# It is apart from 'punctual.cli', where the first argument is always an entries file
+
+
+def parse_args(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compute the schedules of many entries files at once.")
+
+    # Mandatory entries files, e.g. one per user
+    parser.add_argument(
+        'entries_files',
+        type=str,
+        nargs='+',
+        help='Paths to the entries files'
+    )
+
+    # Optional synonyms file path, shared by all schedules
+    parser.add_argument(
+        '--synonyms_file',
+        type=str,
+        help='Path to the synonyms file'
+    )
+
+    parser.add_argument(
+        '--contingency',
+        type=int,
+        help='An amount in minutes that will be added to every entry (default value is 2 minutes)',
+        default=2
+    )
+
+    parser.add_argument(
+        '--online',
+        action=argparse.BooleanOptionalAction,
+        help='Enhance your schedules with online tools, see the same option of a single schedule'
+    )
+
+    parser.add_argument(
+        '--history_file',
+        type=str,
+        action='append',
+        help='Path to a past entries file, used to estimate the duration of unknown entries (can be repeated)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='How many processes compute schedules at the same time (default is the number of CPUs)'
+    )
+
+    # Optional directory where every schedule is written as JSON Lines
+    # instead of being printed
+    parser.add_argument(
+        '--output_dir',
+        type=str,
+        help='Directory where every schedule is written as a JSON Lines file named after its entries file'
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    # the batch engine (and its process pool) is only needed here
+    from punctual._batch import batch, BatchResult
+
+    args = parse_args(argv)
+
+    result: BatchResult = batch(
+        entries_files=args.entries_files,
+        usr_synonyms=parse_synonyms_file(args.synonyms_file) if args.synonyms_file else [],
+        online=args.online,
+        contingency_in_minutes=args.contingency,
+        tablefmt='simple_grid',
+        history_files=args.history_file,
+        max_workers=args.workers
+    )
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for entries_file, schedule in result.schedules.items():
+        if args.output_dir:
+            name = os.path.splitext(os.path.basename(entries_file))[0]
+            with open(os.path.join(args.output_dir, f'{name}.jsonl'), 'w') as f:
+                schedule.to_jsonl(f)
+        else:
+            print(f"Entries file path: {entries_file}")
+            # e.g. an entries file made of comments only
+            if schedule.empty:
+                print("No entries.")
+                continue
+            for line in schedule.lines():
+                print(line)
+
+    print(f"{len(result.schedules)} schedules computed in {result.elapsed:.2f} seconds "
+          f"({result.total:.2f} seconds of work, {result.speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,21 @@
 import argparse
+import os
 import time
+from datetime import datetime
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Union
 
+from punctual.new_core import Entry
 from punctual.new_core import Schedule
-from punctual.new_core import punctual
+from punctual.new_core import ParseCache
+from punctual.new_core import new_parser
+
+# GLOBALS (they must not be visible outside this module)
+
+POLL_INTERVAL_IN_SECONDS = 1
+COMMENT_SYMBOL = '#'
 
 
 def parse_args():
@@ -47,6 +60,23 @@ def parse_args():
         help='Enhance your schedule with online tools. Trip durations will be calculated using a geocoding service, while the durations of unknown entries will be estimated by an AI'
     )
 
+    # Optional past entries files: unknown entries similar to past ones
+    # are estimated locally rather than by an AI
+    parser.add_argument(
+        '--history_file',
+        type=str,
+        action='append',
+        help='Path to a past entries file, used to estimate the duration of unknown entries (can be repeated)'
+    )
+
+    # Print entries as soon as they are timed, without
+    # keeping the whole schedule in memory
+    parser.add_argument(
+        '--stream',
+        action=argparse.BooleanOptionalAction,
+        help='Print entries one by one, as soon as they are timed, e.g. for very large entries files'
+    )
+
     args = parser.parse_args()
 
     return args
@@ -66,6 +96,27 @@ def read_lines_from_file(file_path):
         return []
 
 
+def iter_entries_from_file(file_path):
+    """Yield the entries of a file one by one, skipping blank lines and comments."""
+    try:
+        with open(file_path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith(COMMENT_SYMBOL):
+                    yield line
+    except FileNotFoundError:
+        print(f"Error: The file {file_path} was not found.")
+    except IOError:
+        print(f"Error: An I/O error occurred while reading {file_path}.")
+
+
+def print_stream(entries: Iterator[Entry]):
+    """Print entries as tab separated rows, as soon as they come."""
+    print('\t'.join(Entry.FIELDS))
+    for entry in entries:
+        print('\t'.join(str(getattr(entry, field)) for field in Entry.FIELDS), flush=True)
+
+
 def parse_synonyms_file(file_path):
     """Parse the synonyms file and return a list of tuples (str, int)."""
     lines = read_lines_from_file(file_path)
@@ -79,33 +130,100 @@ def parse_synonyms_file(file_path):
     return synonyms
 
 
+class FileWatcher:
+    """Tells which of the watched files changed since the last check, by polling their modification times."""
+
+    def __init__(self, *file_paths: str):
+        self._file_paths = [file_path for file_path in file_paths if file_path]
+        self._mtimes = self._read_mtimes()
+
+    def _read_mtimes(self) -> Dict[str, Union[int, None]]:
+        result = {}
+        for file_path in self._file_paths:
+            try:
+                result[file_path] = os.stat(file_path).st_mtime_ns
+            except OSError:
+                # a missing file may show up later on
+                result[file_path] = None
+        return result
+
+    def changed(self) -> List[str]:
+        mtimes = self._read_mtimes()
+        result = [file_path for file_path in self._file_paths if mtimes[file_path] != self._mtimes[file_path]]
+        self._mtimes = mtimes
+        return result
+
+
+def wait_for_changes(watcher: FileWatcher, deadline: datetime = None) -> List[str]:
+    """Wait until a watched file changes, or the deadline passes, and return the changed files."""
+    while deadline is None or datetime.now() < deadline:
+        changed = watcher.changed()
+        if changed:
+            return changed
+        time.sleep(POLL_INTERVAL_IN_SECONDS)
+    return []
+
+
 def main():
     args = parse_args()
 
     print(f"Entries file path: {args.entries_file}")
 
     if args.live:
-        print('Schedule will be generated every minute until user shuts the program down')
+        print('Schedule will be generated again whenever files change or an entry starts or ends, '
+              'until user shuts the program down')
 
     if args.synonyms_file:
         print(f"Synonyms file path: {args.synonyms_file}")
     else:
         print("No synonyms provided.")
 
-    while True:
-        result: Schedule = punctual(
-            entries=read_lines_from_file(args.entries_file),
+    watcher = FileWatcher(args.entries_file, args.synonyms_file, *(args.history_file or []))
+    # parse results are reused as long as synonyms do not change, so that
+    # only new or edited entries are parsed (and possibly resolved online) again
+    parse_cache = ParseCache()
+    parser = None
+    changed: List[str] = []
+
+    result: Union[Schedule, None] = None
+
+    if args.stream:
+        print_stream(Schedule.stream(iter_entries_from_file(args.entries_file), parser=new_parser(
             usr_synonyms=parse_synonyms_file(args.synonyms_file) if args.synonyms_file else [],
             online=args.online,
             contingency_in_minutes=args.contingency,
-            tablefmt='simple_grid'
-        )
+            history_files=args.history_file,
+            parse_cache=parse_cache
+        )))
+        return
+
+    while True:
+        if parser is None or any(file_path != args.entries_file for file_path in changed):
+            parse_cache.clear()
+            parser = new_parser(
+                usr_synonyms=parse_synonyms_file(args.synonyms_file) if args.synonyms_file else [],
+                online=args.online,
+                contingency_in_minutes=args.contingency,
+                history_files=args.history_file,
+                parse_cache=parse_cache
+            )
+            result = None
+
+        if result is not None and changed:
+            # only the entries file changed: only the edited lines are parsed and timed again
+            result.update(*read_lines_from_file(args.entries_file), parser=parser)
+        else:
+            result = Schedule.from_entries(*read_lines_from_file(args.entries_file),
+                                           parser=parser,
+                                           tablefmt='simple_grid')
 
-        print(result)
+        for line in result.lines():
+            print(line)
         result.to_clipboard()
 
         if args.live:
-            time.sleep(60)
+            # nothing changes until files are edited or the clock reaches an entry
+            changed = wait_for_changes(watcher, result.next_boundary(datetime.now()))
         else:
             break
 
@@ -2,20 +2,68 @@ import re
 
 from datetime import datetime, timedelta, time, date
 from typing import List
+from typing import NamedTuple
 from typing import Tuple
+from typing import Union
 from typing import LiteralString
 
-from tabulate import tabulate
-
 # GLOBALS (they must not be visible outside this module)
 
 DIRECTION_SYMBOL = ' -> '
 ENTRY_DETAIL_SEPARATOR = ';'
+# words carrying no meaning about how long an entry lasts
+STOPWORDS = frozenset(['a', 'an', 'the', 'my', 'our', 'your', 'some', 'to', 'of', 'for', 'at', 'in', 'on', 'with'])
+WORD = re.compile(r'[^\W_]+')
+# the grammar of an entry: <duration | synonym | A -> B>[; HH:MM]
+ENTRY = re.compile(r'(?P<name>[^;]*)(?:;(?P<at>[^;]*))?')
+AT = re.compile(r'\s*(?P<hour>\d{1,2}):(?P<minute>\d{1,2})\s*')
+DURATION = re.compile(r'(\d+)([hm])')
 
 
 # IMPLEMENTATION
 
 
+class ParsedEntry(NamedTuple):
+    # the entry without its start time
+    name: str
+    # the start time specified by the user, if any
+    at: Union[time, None]
+    # the duration written in the entry, such as "1h30m", 0 if none
+    minutes: int
+    # start and end locations (lowercase) when the entry is a direction
+    locations: Union[Tuple[str, ...], None]
+
+    @property
+    def is_direction(self) -> bool:
+        return self.locations is not None
+
+    @property
+    def key(self) -> str:
+        # how the entry is referred to among synonyms
+        if self.is_direction:
+            locations = sorted(self.locations)
+            # expected at max two locations
+            return f'{locations[0]} - {locations[1]}'
+        return synonym_key(self.name)
+
+
+def tokenize_entry(entry: str) -> ParsedEntry:
+    match = ENTRY.fullmatch(entry)
+    if match is None:
+        raise ValueError(f'Expected at most one "{ENTRY_DETAIL_SEPARATOR}" in entry "{entry}"')
+    name, at_as_string = match.group('name', 'at')
+
+    at = None
+    if at_as_string is not None:
+        name = name.strip()
+        at = parse_time(at_as_string)
+
+    return ParsedEntry(name,
+                       at,
+                       parse_duration(name),
+                       tuple(name.lower().split(DIRECTION_SYMBOL)) if DIRECTION_SYMBOL in name else None)
+
+
 def hello_world():
     return 'Hello world!'
 
@@ -54,6 +102,11 @@ def synonym_key(entry: str) -> str:
     return entry.lower()
 
 
+def entry_tokens(entry: str) -> List[str]:
+    # e.g. "Cleaning the kitchen!" and "cleaning kitchen" have the same tokens
+    return [word for word in WORD.findall(entry.lower()) if word not in STOPWORDS]
+
+
 def add_synonym_duration(entry: str, synonyms: dict, duration_in_minutes: int):
     key = direction_key(entry) if is_direction(entry) else synonym_key(entry)
     synonyms[key] = {'duration': duration_in_minutes}
@@ -65,14 +118,20 @@ def get_synonym_duration(entry: str, synonyms: dict) -> int:
 
 
 def get_duration(entry: str, synonyms: dict) -> int:
+    return get_parsed_duration(tokenize_entry(entry), synonyms)
+
+
+def get_parsed_duration(entry: ParsedEntry, synonyms: dict) -> int:
     # always do an attempt to get duration from entries such as:
     # "1h33m", "30m", "2h"
-    entry_duration_minutes = parse_duration(entry)
+    entry_duration_minutes = entry.minutes
 
     # entry is in the form of a synonym, such as:
     # "Rome -> Paris", "Shower"
-    if entry_duration_minutes == 0 and is_synonym(entry, synonyms):
-        entry_duration_minutes = get_synonym_duration(entry, synonyms)
+    if entry_duration_minutes == 0:
+        synonym = synonyms.get(entry.key)
+        if synonym is not None:
+            entry_duration_minutes = synonym['duration']
 
     return entry_duration_minutes
 
@@ -87,20 +146,17 @@ def parse_duration(entry: str) -> int:
     Returns:
         int: The total duration in minutes.
     """
-    hours = 0
-    minutes = 0
-
-    # Regular expressions to find hours and minutes
-    hours_match = re.search(r'(\d+)h', entry)
-    minutes_match = re.search(r'(\d+)m', entry)
+    hours = None
+    minutes = None
 
-    if hours_match:
-        hours = int(hours_match.group(1))
+    # the first hours and the first minutes found count, all found in a single scan
+    for amount, unit in DURATION.findall(entry):
+        if unit == 'h' and hours is None:
+            hours = int(amount)
+        elif unit == 'm' and minutes is None:
+            minutes = int(amount)
 
-    if minutes_match:
-        minutes = int(minutes_match.group(1))
-
-    total_minutes = hours * 60 + minutes
+    total_minutes = (hours if hours else 0) * 60 + (minutes if minutes else 0)
 
     return total_minutes
 
@@ -143,6 +199,9 @@ def prettify_all_dates_in_dict(obj: dict, perform_copy: bool = True) -> dict:
 
 
 def prettify_report(report: dict, headers: List[str] = None, tablefmt: str = None) -> str:
+    # tabulate is only imported when a report is actually rendered
+    from tabulate import tabulate
+
     # TODO contribute to 'tabulate' library for custom formats of dates
     result = prettify_all_dates_in_dict(report)
 
@@ -164,9 +223,19 @@ def is_first_entry(user_output: dict) -> bool:
     return len(user_output['entries']) == 0
 
 
+def parse_time(at_as_string: str) -> time:
+    match = AT.fullmatch(at_as_string)
+    if match is None:
+        raise ValueError(f"time data '{at_as_string}' does not match format '%H:%M'")
+    return time(hour=int(match.group('hour')), minute=int(match.group('minute')))
+
+
 def parse_at(at_as_string: str, start_time: datetime) -> datetime:
+    return combine_at(parse_time(at_as_string), start_time)
+
+
+def combine_at(time_info: time, start_time: datetime) -> datetime:
     date_info: date = start_time.date()
-    time_info: time = datetime.strptime(at_as_string, '%H:%M').time()
     # 'start_time' represents the time of the previous entry (if any).
     # The following condition checks if the current entry's time is earlier in the day
     # than the previous entry's time, indicating that the current entry occurs on the
@@ -178,13 +247,8 @@ def parse_at(at_as_string: str, start_time: datetime) -> datetime:
 
 
 def parse_entry(parsable_entry: str, start_time: datetime):
-    def haircut(parts: List[str]) -> List[str]:
-        return [p.strip() for p in parts]
-
-    if ';' in parsable_entry:
-        entry, at_as_string = haircut(parsable_entry.split(';'))
-        return entry, parse_at(at_as_string, start_time)
-    return parsable_entry, None
+    entry = tokenize_entry(parsable_entry)
+    return entry.name, combine_at(entry.at, start_time) if entry.at else None
 
 
 def is_overlap(previous: datetime, after: datetime) -> bool:
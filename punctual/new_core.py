@@ -1,22 +1,33 @@
 import os
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
 from json import loads
 from abc import ABC, abstractmethod
 from enum import Enum
 from datetime import datetime
+from datetime import time
 from datetime import timedelta
+from typing import BinaryIO
+from typing import Dict
 from typing import Generic
+from typing import Iterable
+from typing import Iterator
+from typing import TextIO
 from typing import List
-from typing import NamedTuple
 from typing import Tuple
 from typing import TypeVar
 from typing import Union
+from collections import OrderedDict
 from functools import cached_property
 from functools import lru_cache
-
-import pyperclip
+from itertools import islice
+from operator import attrgetter
 
 from punctual.core import add_synonym_duration
-from punctual.core import get_duration
+from punctual.core import tokenize_entry
+from punctual.core import combine_at
+from punctual.core import ParsedEntry
 from punctual.core import is_overlap
 from punctual.core import minutes_between_entries
 from punctual.core import parse_entry
@@ -24,10 +35,7 @@ from punctual.core import prettify_report
 from punctual.core import is_direction
 from punctual.core import start_location
 from punctual.core import end_location
-from punctual._mapbox import geocode
-from punctual._mapbox import direction_duration
-from punctual._mapbox import RoutingProfile
-from punctual._openai import guess_duration
+from punctual._synonyms import SynonymIndex
 
 
 class Profile:
@@ -45,6 +53,18 @@ class Profile:
         return self._body['openai']['token']
 
 
+@lru_cache(maxsize=8)
+def _read_profile(file: str, mtime: int) -> Profile:
+    # the modification time is part of the key: an edited profile is read again
+    return Profile(file)
+
+
+def load_profile(file: str = None) -> Profile:
+    """The profile shared by the whole process, read again only when its file changes."""
+    file = file if file else os.environ.get('PUNCTUAL_PROFILE')
+    return _read_profile(file, os.stat(file).st_mtime_ns)
+
+
 class TripDurationProvider(Enum):
     SYNONYMS = 1
     MAPBOX = 2
@@ -54,6 +74,14 @@ ParsableEntryType = TypeVar('ParsableEntryType')
 
 
 class Parser(ABC, Generic[ParsableEntryType]):
+    # parsers relying on remote services are slow, their entries
+    # are worth resolving concurrently
+    remote: bool = False
+
+    def prefetch(self, entries: List[ParsableEntryType]):
+        # called with all the entries of a schedule before they are parsed (in order),
+        # by default there is nothing to prepare
+        pass
 
     @abstractmethod
     def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
@@ -63,64 +91,310 @@ class Parser(ABC, Generic[ParsableEntryType]):
     def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
         raise NotImplementedError("To be implemented in subclasses")
 
+    def try_parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Union[
+            Tuple[str, timedelta, Union[datetime, None]], None]:
+        # None when the entry is not parsable. Subclasses checking an entry by parsing it
+        # should return that result rather than parsing the entry twice
+        return self.parse(entry, **kwargs) if self.is_parsable(entry) else None
+
 
 class MapboxParser(Parser):
+    remote = True
+
+    def __init__(self,
+                 cache_dir: str = None,
+                 pool_size: int = 10,
+                 retries: int = 3,
+                 timeout: float = 10,
+                 matrix: bool = True,
+                 base_url: str = None):
+        # Nothing is read, opened nor even imported until the first trip is resolved:
+        # see the cached properties below
+        self._cache_dir = cache_dir
+        self._pool_size = pool_size
+        self._retries = retries
+        self._timeout = timeout
+        self._custom_base_url = base_url
+        # whether trip durations are fetched all at once, see 'prefetch'
+        self._matrix = matrix
+        # how many requests actually reached Mapbox
+        self.remote_calls = 0
+
+    @property
+    def _profile(self) -> Profile:
+        return load_profile()
+
+    @cached_property
+    def _cache(self) -> "PersistentCache":
+        from punctual._cache import PersistentCache
+        # geocoding results and trip durations are persisted across runs
+        return PersistentCache('mapbox', directory=self._cache_dir)
+
+    @cached_property
+    def _session(self) -> "requests.Session":
+        from punctual._mapbox import new_session
+        # all requests to Mapbox share the same (kept alive) connections
+        result = new_session(pool_size=self._pool_size, retries=self._retries)
+        result.hooks['response'].append(self._count_remote_call)
+        return result
 
-    def __init__(self):
-        self._profile = Profile()
+    @cached_property
+    def _base_url(self) -> str:
+        from punctual._mapbox import MAPBOX_API_URL
+        return self._custom_base_url if self._custom_base_url else MAPBOX_API_URL
 
-    def _get_duration(self, entry_name: str) -> timedelta:
+    @cached_property
+    def _routing_profile(self) -> "RoutingProfile":
+        from punctual._mapbox import RoutingProfile
+        # TODO 1. allow user to specify a routing profile per entry
+        return RoutingProfile.DRIVING
+
+    def _count_remote_call(self, response, *args, **kwargs):
+        self.remote_calls = self.remote_calls + 1
+
+    def _geocode(self, location: str) -> Tuple[str, Tuple[float, float]]:
+        from punctual._mapbox import geocode, location_key
+        # the same location may be written in many ways, e.g. "Rome, Italy" or "rome,  italy "
+        return geocode(location_key(location), self._profile.mapbox_token, self._cache, self._session, self._timeout,
+                       self._base_url)
+
+    def _locations(self, entry: Generic[ParsableEntryType]) -> Tuple[str, str]:
+        from punctual._mapbox import location_key
+        entry_name, _ = parse_entry(entry, datetime.now())
+        return location_key(start_location(entry_name)), location_key(end_location(entry_name))
+
+    def prefetch(self, entries: List[ParsableEntryType]):
+        # Trips of a schedule often go back and forth between the same few places: instead of
+        # one request per trip, geocode every place once and get all durations from one
+        # Matrix API request. Trips are then served from the cache when parsed
+        if not self._matrix:
+            return
+        import requests
+        from punctual._mapbox import direction_key, duration_matrix, MAX_MATRIX_COORDINATES
+
+        trips: List[Tuple[str, str]] = [self._locations(entry) for entry in entries if self.is_parsable(entry)]
+        places: List[str] = list(dict.fromkeys(place for trip in trips for place in trip))
+        with ThreadPoolExecutor(max_workers=self._pool_size) as executor:
+            coordinates: dict = dict(zip(places, executor.map(lambda place: self._geocode(place)[1], places)))
+        missing: List[Tuple[Tuple[float, float], Tuple[float, float]]] = list(dict.fromkeys(
+            (coordinates[start], coordinates[end]) for start, end in trips
+            if self._cache.get(direction_key([coordinates[start], coordinates[end]], self._routing_profile)) is None))
+        points: List[Tuple[float, float]] = list(dict.fromkeys(point for trip in missing for point in trip))
+        # otherwise, trips are resolved one by one
+        if not 2 <= len(points) <= MAX_MATRIX_COORDINATES:
+            return
+        try:
+            matrix = duration_matrix(points, self._routing_profile, self._profile.mapbox_token,
+                                     self._session, self._timeout, self._base_url)
+        except (requests.RequestException, KeyError, ValueError):
+            return
+        index: dict = {point: i for i, point in enumerate(points)}
+        for start, end in missing:
+            duration = matrix[index[start]][index[end]]
+            if duration is not None:
+                self._cache.set(direction_key([start, end], self._routing_profile), duration.total_seconds())
+
+    def _resolve(self, entry_name: str) -> Tuple[str, timedelta]:
+        from punctual._mapbox import direction_duration
+        # every location of the direction is geocoded exactly once
+        start_entry_name, start_coord = self._geocode(start_location(entry_name))
+        end_entry_name, end_coord = self._geocode(end_location(entry_name))
         # never fallback on synonyms for calculating the duration of a direction
-        _, start_coord = geocode(start_location(entry_name), self._profile.mapbox_token)
-        _, end_coord = geocode(end_location(entry_name), self._profile.mapbox_token)
-        return direction_duration(
-            # TODO 1. allow user to specify a routing profile per entry
+        duration = direction_duration(
             # TODO 2. allow user to specify a 'depart_at' time, as features by Mapbox API:
             # TODO    https://docs.mapbox.com/playground/directions/?coordinates=12.42942%2C41.834776&coordinates=12.496166500000001%2C41.902633&steps=false&notifications=none&alternatives=false
-            [start_coord, end_coord], routing_profile=RoutingProfile.DRIVING, token=self._profile.mapbox_token)
-
-    def _fix_entry_name(self, entry_name: str) -> str:
+            [start_coord, end_coord], routing_profile=self._routing_profile, token=self._profile.mapbox_token,
+            cache=self._cache, session=self._session, timeout=self._timeout, base_url=self._base_url)
         # When using Mapbox, we need to update the user's entered location with the actual matched location.
         # This ensures the user can verify that Mapbox has provided the correct location.
-        start_entry_name, _ = geocode(start_location(entry_name), self._profile.mapbox_token)
-        end_entry_name, _ = geocode(end_location(entry_name), self._profile.mapbox_token)
         return (f'{start_entry_name}\n'
-                f'{end_entry_name}')
+                f'{end_entry_name}'), duration
 
     def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
         return not entry.startswith('#') and is_direction(entry)
 
     def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
         entry_name, at = parse_entry(entry, kwargs.get('start_time'))
-        return self._fix_entry_name(entry_name), self._get_duration(entry_name), at
+        name, duration = self._resolve(entry_name)
+        return name, duration, at
 
 
 class OpenAIGuessParser(Parser):
+    remote = True
+
+    def __init__(self, cache_dir: str = None, similarity: float = 0.75, openai_client=None):
+        # Nothing is read, opened nor even imported until the first entry is guessed:
+        # see the cached properties below
+        self._cache_dir = cache_dir
+        self._similarity = similarity
+        # if not provided, a client shared by all requests with the same token is used
+        self._openai_client = openai_client
+        # durations guessed all at once, see 'prefetch'
+        self._guesses: dict = {}
 
-    def __init__(self):
-        self._profile = Profile()
+    @property
+    def _profile(self) -> Profile:
+        return load_profile()
+
+    @cached_property
+    def _cache(self) -> "GuessCache":
+        from punctual._cache import PersistentCache
+        from punctual._openai import GuessCache
+        # the AI is asked only once about the same (or a similar) entry
+        return GuessCache(PersistentCache('openai', directory=self._cache_dir), similarity=self._similarity)
+
+    def prefetch(self, entries: List[ParsableEntryType]):
+        from punctual._openai import guess_durations
+        # ask the AI about all entries with a single request
+        entry_names = [parse_entry(entry, datetime.now())[0] for entry in entries if self.is_parsable(entry)]
+        if len(entry_names) > 0:
+            self._guesses.update(guess_durations(entry_names, self._profile.openai_token, self._cache,
+                                                 self._openai_client))
 
     def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
         return not entry.startswith('#')
 
     def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
         entry_name, at = parse_entry(entry, kwargs.get('start_time'))
-        return entry_name, guess_duration(entry_name, self._profile.openai_token), at
+        if entry_name in self._guesses:
+            return entry_name, self._guesses[entry_name], at
+        from punctual._openai import guess_duration
+        return entry_name, guess_duration(entry_name, self._profile.openai_token, self._cache,
+                                          self._openai_client), at
+
+
+class LocalGuessParser(Parser):
+
+    def __init__(self, estimator: "LocalDurationEstimator", threshold: float = 0.6):
+        self._estimator = estimator
+        # below this confidence, estimates are not trusted
+        self._threshold = threshold
+        self._estimates: dict = {}
+
+    def _estimate(self, entry_name: str) -> Tuple[float, float]:
+        if entry_name not in self._estimates:
+            self._estimates[entry_name] = self._estimator.estimate(entry_name)
+        return self._estimates[entry_name]
+
+    def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
+        return self.try_parse(entry, start_time=datetime.now()) is not None
+
+    def try_parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Union[
+            Tuple[str, timedelta, Union[datetime, None]], None]:
+        if entry.startswith('#') or is_direction(entry):
+            return None
+        entry_name, at = parse_entry(entry, kwargs.get('start_time'))
+        minutes, confidence = self._estimate(entry_name)
+        return (entry_name, timedelta(minutes=minutes), at) if confidence >= self._threshold else None
+
+    def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
+        entry_name, at = parse_entry(entry, kwargs.get('start_time'))
+        minutes, _ = self._estimate(entry_name)
+        return entry_name, timedelta(minutes=minutes), at
 
 
 class FallbackParser(Parser):
 
     def __init__(self, synonyms: dict):
-        self._synonyms: dict = synonyms
+        # synonyms are also looked up approximately
+        self._synonyms: SynonymIndex = synonyms if isinstance(synonyms, SynonymIndex) \
+            else SynonymIndex.from_dict(synonyms)
 
     def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
-        entry_name, duration, at = self.parse(entry, start_time=datetime.now())
-        return not entry.startswith('#') and duration.total_seconds() > 0
+        return self.try_parse(entry, start_time=datetime.now()) is not None
+
+    def try_parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Union[
+            Tuple[str, timedelta, Union[datetime, None]], None]:
+        if entry.startswith('#'):
+            return None
+        entry_name, duration, at = self.parse(entry, **kwargs)
+        return (entry_name, duration, at) if duration.total_seconds() > 0 else None
 
     def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
-        entry_name, at = parse_entry(entry, kwargs.get('start_time'))
-        duration = timedelta(minutes=get_duration(entry_name, self._synonyms))
-        return entry_name, duration, at
+        # the entry is scanned once, for its name, start time and duration
+        parsed: ParsedEntry = tokenize_entry(entry)
+        at = combine_at(parsed.at, kwargs.get('start_time')) if parsed.at else None
+        duration = timedelta(minutes=parsed.minutes if parsed.minutes else self._synonyms.duration(parsed))
+        return parsed.name, duration, at
+
+
+class ParseCache:
+    """
+    A bounded cache of parse results, evicting the least recently used ones.
+
+    It can outlive parsers: e.g. re-parsing the same entries every minute is nearly free.
+    Since results depend on the synonyms, clear the cache whenever they change.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._results: OrderedDict = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._results
+
+    def get(self, key: tuple):
+        if key in self._results:
+            self.hits = self.hits + 1
+            self._results.move_to_end(key)
+            return self._results[key]
+        self.misses = self.misses + 1
+        return None
+
+    def put(self, key: tuple, result):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+
+class CachedParser(Parser):
+
+    def __init__(self, parser: Parser, cache: ParseCache, namespace: str):
+        self._parser = parser
+        self._cache = cache
+        # many parsers may share the same cache
+        self._namespace = namespace
+        self.remote = parser.remote
+
+    def _cached(self, method: str, entry: Generic[ParsableEntryType], start_time: Union[datetime, None], compute):
+        # parsing an entry depends on the date and the hour of the start time only (see 'parse_at')
+        key = (self._namespace, method, entry,
+               start_time.date() if start_time else None, start_time.hour if start_time else None)
+        # results may be None, e.g. when trying to parse an entry
+        if key in self._cache:
+            return self._cache.get(key)
+        self._cache.misses = self._cache.misses + 1
+        result = compute()
+        self._cache.put(key, result)
+        return result
+
+    def prefetch(self, entries: List[ParsableEntryType]):
+        self._parser.prefetch(entries)
+
+    def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
+        return self._cached('is_parsable', entry, None, lambda: self._parser.is_parsable(entry))
+
+    def try_parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Union[
+            Tuple[str, timedelta, Union[datetime, None]], None]:
+        return self._cached('try_parse', entry, kwargs.get('start_time'),
+                            lambda: self._parser.try_parse(entry, **kwargs))
+
+    def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
+        return self._cached('parse', entry, kwargs.get('start_time'), lambda: self._parser.parse(entry, **kwargs))
 
 
 class StandardParser(Parser):
@@ -128,16 +402,32 @@ class StandardParser(Parser):
     def __init__(self,
                  synonyms: List[Tuple[str, int]],
                  trip_duration_provider: TripDurationProvider = TripDurationProvider.SYNONYMS,
-                 contingency: timedelta = None):
+                 contingency: timedelta = None,
+                 max_workers: int = 8,
+                 estimator: "LocalDurationEstimator" = None,
+                 parse_cache: ParseCache = None,
+                 cache_dir: str = None):
         # the user can specify synonyms: they are like labels with a duration
         # so that the user can refer to a duration by its label (i.e. synonym)
-        self._synonyms = {}
+        self._synonyms = SynonymIndex()
         for syn in synonyms:
             add_synonym_duration(syn[0], self._synonyms, syn[1])
         self._contingency = contingency if contingency else timedelta(minutes=2)
         self._trip_duration_provider = trip_duration_provider
         # this parser actually delegates the work to other parsers
         self._additional_parsers: List[Parser] = []
+        self._online = True
+        # the parser each entry has been dispatched to
+        self._classification: dict = {}
+        # names and durations of entries already resolved by remote parsers
+        self._prefetched: dict = {}
+        self._max_workers = max_workers
+        # if provided, unknown entries similar to known ones are estimated locally
+        self._estimator = estimator
+        # results of offline parsers, possibly shared with other instances
+        self._parse_cache = parse_cache if parse_cache is not None else ParseCache()
+        # where online parsers persist their results (see 'PersistentCache'), possibly shared with other processes
+        self._cache_dir = cache_dir
         # First, toggle only the default parser.
         # The user can then call 'toggle_additional_parsers' again
         # to enable the other available parsers as needed
@@ -145,21 +435,29 @@ class StandardParser(Parser):
 
     @cached_property
     def default_parser(self) -> Parser:
-        return FallbackParser(self._synonyms)
+        return CachedParser(FallbackParser(self._synonyms), self._parse_cache, 'default')
+
+    @cached_property
+    def local_guess_parser(self) -> Parser:
+        return CachedParser(LocalGuessParser(self._estimator), self._parse_cache, 'local')
 
     @cached_property
     def mapbox_parser(self) -> Parser:
-        return MapboxParser()
+        return MapboxParser(cache_dir=self._cache_dir)
 
     @cached_property
     def open_ai_guess_parser(self) -> Parser:
-        return OpenAIGuessParser()
+        return OpenAIGuessParser(cache_dir=self._cache_dir)
 
     def toggle_online_parsers(self):
-        if len(self._additional_parsers) == 1:
+        self._online = not self._online
+        self._classification = {}
+        if self._online:
             self._additional_parsers = [
                 self.mapbox_parser,
                 self.default_parser,
+                # the AI is asked only about entries that cannot be estimated locally
+                *([self.local_guess_parser] if self._estimator else []),
                 self.open_ai_guess_parser,
             ]
         else:
@@ -169,23 +467,71 @@ class StandardParser(Parser):
             if self._trip_duration_provider is TripDurationProvider.MAPBOX:
                 self._additional_parsers.append(self.mapbox_parser)
             self._additional_parsers.append(self.default_parser)
+            if self._estimator:
+                self._additional_parsers.append(self.local_guess_parser)
+
+    def _dispatch(self, entry: Generic[ParsableEntryType]) -> Parser:
+        if entry not in self._classification:
+            # parsers are asked in order of priority, until one of them can parse the entry.
+            # Ideally there is at least one mathced parser
+            # but not always. Since we want to show the user a Schedule no matter
+            # what, let's fallback on the default parser
+            self._classification[entry] = next(filter(lambda p: p.is_parsable(entry), self._additional_parsers),
+                                               self.default_parser)
+        return self._classification[entry]
+
+    def _dispatch_and_parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[
+            str, timedelta, Union[datetime, None]]:
+        if entry in self._classification:
+            return self._classification[entry].parse(entry, **kwargs)
+        # same as '_dispatch', but a parser checking an entry by parsing it
+        # does not need to parse it again
+        for parser in self._additional_parsers:
+            result = parser.try_parse(entry, **kwargs)
+            if result is not None:
+                self._classification[entry] = parser
+                return result
+        self._classification[entry] = self.default_parser
+        return self.default_parser.parse(entry, **kwargs)
+
+    def prefetch(self, entries: List[ParsableEntryType]):
+        # Remote parsers block for a while on every entry: resolve all entries bound to them
+        # at once, so that parsing them in order later on does not wait anymore
+        if not any(parser.remote for parser in self._additional_parsers):
+            return
+        remote: dict = {}
+        for entry in entries:
+            parser = self._dispatch(entry)
+            if parser.remote and entry not in self._prefetched:
+                remote[entry] = parser
+        if len(remote) == 0:
+            return
+        # remote parsers may have their own way to resolve many entries at once
+        for parser in set(remote.values()):
+            parser.prefetch([entry for entry, p in remote.items() if p is parser])
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            # the start time is only needed to compute the 'at' part, which is parsed again later
+            futures = {entry: executor.submit(parser.parse, entry, start_time=datetime.now())
+                       for entry, parser in remote.items()}
+        for entry, future in futures.items():
+            entry_name, duration, _ = future.result()
+            self._prefetched[entry] = entry_name, duration
 
     def is_parsable(self, entry: Generic[ParsableEntryType]) -> bool:
         return not entry.startswith('#')
 
     def parse(self, entry: Generic[ParsableEntryType], **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
-        parsers: List[Parser] = list(filter(lambda p: p.is_parsable(entry), self._additional_parsers))
-        if len(parsers) > 0:
-            entry_name, duration, at = parsers[0].parse(entry, **kwargs)
-        # ideally there is at least one mathced parser
-        # but not always. Since we want to show the user a Schedule no matter
-        # what, let's fallback on the default parser
+        if entry in self._prefetched:
+            _, at = parse_entry(entry, kwargs.get('start_time'))
+            entry_name, duration = self._prefetched[entry]
         else:
-            entry_name, duration, at = self.default_parser.parse(entry, **kwargs)
+            entry_name, duration, at = self._dispatch_and_parse(entry, **kwargs)
         return entry_name, duration + self._contingency, at
 
 
 class SignedTimedelta:
+    __slots__ = ('_sign', '_duration')
+
     _POSITIVE = '+'
     _NEGATIVE = '-'
     _ZERO = '='
@@ -206,34 +552,120 @@ class SignedTimedelta:
     def zero(cls) -> "SignedTimedelta":
         return SignedTimedelta(cls._ZERO, timedelta(days=0, hours=0, minutes=0))
 
+    @classmethod
+    def from_timedelta(cls, duration: timedelta) -> "SignedTimedelta":
+        if duration < timedelta(0):
+            return cls.negative(-duration)
+        return cls.positive(duration) if duration else cls.zero()
+
     @property
     def is_zero(self) -> bool:
         return self._sign == self._ZERO or self._duration.total_seconds() == 0
 
+    @property
+    def signed_duration(self) -> timedelta:
+        return -self._duration if self._sign == self._NEGATIVE else self._duration
+
     def __str__(self):
         if self.is_zero:
             return ''
         return f'{self._sign} {self._duration}'
 
 
-class Entry(NamedTuple):
-    name: str
-    start_time: datetime
-    end_time: datetime
-    duration: timedelta
-    extra: SignedTimedelta
-    fixed: bool
+def _microseconds(duration: timedelta) -> int:
+    return (duration.days * 86400 + duration.seconds) * 1000000 + duration.microseconds
+
+
+class Entry:
+    # Entries are stored as plain integers (microseconds since EPOCH for dates, microseconds
+    # for durations): there may be a lot of them, so the datetime, timedelta and SignedTimedelta
+    # objects are only created when accessed
+    __slots__ = ('name', '_start', '_end', '_duration', '_extra', 'fixed')
+
+    EPOCH = datetime(1970, 1, 1)
+    FIELDS = ('name', 'start_time', 'end_time', 'duration', 'extra', 'fixed')
+
+    def __init__(self,
+                 name: str,
+                 start_time: datetime,
+                 end_time: datetime,
+                 duration: timedelta,
+                 extra: SignedTimedelta,
+                 fixed: bool):
+        self.name: str = name
+        self._start: int = _microseconds(start_time - Entry.EPOCH)
+        self._end: int = _microseconds(end_time - Entry.EPOCH)
+        self._duration: int = _microseconds(duration)
+        self._extra: int = _microseconds(extra.signed_duration)
+        self.fixed: bool = fixed
+
+    @property
+    def start_time(self) -> datetime:
+        return Entry.EPOCH + timedelta(microseconds=self._start)
+
+    @property
+    def end_time(self) -> datetime:
+        return Entry.EPOCH + timedelta(microseconds=self._end)
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(microseconds=self._duration)
+
+    @property
+    def extra(self) -> SignedTimedelta:
+        return SignedTimedelta.from_timedelta(timedelta(microseconds=self._extra))
 
     @property
     def minutes(self) -> float:
-        return self.duration.total_seconds() / 60
+        return self._duration / 60000000
+
+    @classmethod
+    def _make(cls, values: Iterable) -> "Entry":
+        # the opposite of '_astuple': no datetime nor timedelta is involved,
+        # e.g. when loading many entries at once
+        result: Entry = cls.__new__(cls)
+        result.name, result._start, result._end, result._duration, result._extra, result.fixed = values
+        return result
+
+    def _astuple(self) -> tuple:
+        return self.name, self._start, self._end, self._duration, self._extra, self.fixed
+
+    def _asdict(self) -> dict:
+        return {field: getattr(self, field) for field in Entry.FIELDS}
+
+    def __eq__(self, other):
+        return isinstance(other, Entry) and self._astuple() == other._astuple()
+
+    def __hash__(self):
+        return hash(self._astuple())
+
+    def __repr__(self):
+        return f'Entry({", ".join(f"{field}={getattr(self, field)!r}" for field in Entry.FIELDS)})'
 
 
 class Schedule:
 
     def __init__(self, tablefmt: str = None):
+        # entries are always kept ordered by start_time: new entries are placed
+        # with a binary search instead of re-sorting the whole list
         self._entries: List[Entry] = []
+        # running total of all durations (in microseconds), kept up to date
+        # by every method adding entries
+        self._total_duration: int = 0
         self._tablefmt = tablefmt
+        # the id of the line each entry was parsed from (None if not parsed from a line):
+        # it always has the same length and order as '_entries'
+        self._sources: List[Union[int, None]] = []
+        # the parsable lines the schedule is made of, in their original order, with their ids
+        # (see 'update')
+        self._lines: List[str] = []
+        self._line_ids: List[int] = []
+        self._next_line_id: int = 0
+        # the name, duration and time of day ('at', if any) each line was parsed into, by line id:
+        # the start of a fixed entry depends on its previous entry only through 'combine_at'
+        self._parsed: Dict[int, Tuple[str, timedelta, Union[time, None]]] = {}
+        # when the first entry starts, unless it is fixed: right now by default
+        self._start_time: Union[datetime, None] = None
 
     # CONSTRUCTORS
 
@@ -249,18 +681,81 @@ class Schedule:
         return result
 
     @classmethod
-    def from_entries(cls, *entries: Generic[ParsableEntryType], parser: Parser[Generic[ParsableEntryType]], tablefmt: str = None):
+    def from_entries(cls, *entries: Generic[ParsableEntryType], parser: Parser[Generic[ParsableEntryType]], tablefmt: str = None,
+                     start: datetime = None):
         result: Schedule = cls(tablefmt=tablefmt)
+        result._start_time = start
+        parsable_entries = [e for e in entries if parser.is_parsable(e)]
+        # e.g. entries requiring online services are resolved all together
+        parser.prefetch(parsable_entries)
         i = 0
-        for entry in [e for e in entries if parser.is_parsable(e)]:
+        for entry in parsable_entries:
             name, duration, start = parser.parse(
                 entry,
                 # FIX-20240531: The StandardParser requires start_time to extrapolate
                 # the date (year, month and day) to compose the entry start_time
-                start_time=Schedule._now() if i == 0 else result.last.start_time
+                start_time=result._first_start_time() if i == 0 else result.last.start_time
             )
-            result.append(name, duration, start)
+            result._append(name, duration, start, source=i)
+            result._parsed[i] = name, duration, start.time() if start else None
             i = i + 1
+        result._lines = parsable_entries
+        result._line_ids = list(range(i))
+        result._next_line_id = i
+        return result
+
+    @classmethod
+    def stream(cls, entries: Iterable[ParsableEntryType], parser: Parser[Generic[ParsableEntryType]],
+               chunk_size: int = 256) -> Iterator[Entry]:
+        """
+
+        Args:
+            entries: any iterable of entries, e.g. a generator reading a (very large) file lazily
+            parser: the parser of the entries
+            chunk_size: how many entries are parsed at once, e.g. entries requiring online
+                services are resolved a chunk at a time
+
+        Returns:
+            the same entries 'from_entries' would make, one by one as soon as they are timed
+            (an entry never changes once timed) and in the order of 'entries'.
+            Only a chunk of entries is kept in memory at a time
+        """
+        timing: Schedule = cls()
+        # the entry starting last is the one the next entry follows
+        last: Union[Entry, None] = None
+        parsable_entries = (e for e in entries if parser.is_parsable(e))
+        while True:
+            chunk = list(islice(parsable_entries, chunk_size))
+            if len(chunk) == 0:
+                return
+            parser.prefetch(chunk)
+            for entry in chunk:
+                name, duration, start = parser.parse(
+                    entry,
+                    start_time=Schedule._now() if last is None else last.start_time
+                )
+                result: Entry = timing._make_entry(name, duration, start, last)
+                if last is None or result._start >= last._start:
+                    last = result
+                yield result
+
+    @classmethod
+    def from_parsed(cls, parsed: Iterable[Tuple[str, timedelta, Union[datetime, None]]], tablefmt: str = None):
+        # 'parsed' is made of (name, duration, start) tuples, as returned by any Parser.
+        # All entries are timed in a single sweep, producing the same entries as
+        # appending them one by one
+        result: Schedule = cls(tablefmt=tablefmt)
+        last: Union[Entry, None] = None
+        for name, duration, start in parsed:
+            entry: Entry = result._make_entry(name, duration, start, last)
+            result._entries.append(entry)
+            result._total_duration += entry._duration
+            # the entry starting last is the one the next entry follows
+            if last is None or entry.start_time >= last.start_time:
+                last = entry
+        # entries are almost always already in order, so this is a single linear pass
+        result._entries.sort(key=attrgetter('_start'))
+        result._sources = [None] * len(result._entries)
         return result
 
     # MAGIC METHODS & PROPERTIES
@@ -277,7 +772,13 @@ class Schedule:
         }
 
     def __str__(self):
-        return prettify_report(self.__dict__(), tablefmt=self._tablefmt)
+        return '\n'.join(self.lines())
+
+    def __setstate__(self, state: dict):
+        # '__dict__' is the report of the schedule, not its attributes: restore them one by one
+        # (e.g. schedules computed by other processes)
+        for name, value in state.items():
+            setattr(self, name, value)
 
     @property
     def empty(self) -> bool:
@@ -295,7 +796,7 @@ class Schedule:
 
     @property
     def minutes(self) -> float:
-        return sum([entry.minutes for entry in self._entries])
+        return self._total_duration / 60000000
 
     @property
     def start(self) -> datetime:
@@ -311,43 +812,33 @@ class Schedule:
         if self.empty:
             raise IndexError("There are no entries")
 
-    def _previous_entry(self, previous_entry_index: int = None) -> Entry:
-        # Allows the user to insert an entry at a specified index,
-        # otherwise defaults to last entry
-        result: Entry
-        if previous_entry_index is not None:
-            result = self._entries[previous_entry_index]
-        else:
-            result = self.last
-        return result
+    def _first_start_time(self) -> datetime:
+        return self._start_time if self._start_time else Schedule._now()
 
-    def _start_end_time(self, duration: timedelta, start: datetime = None, previous_entry_index: int = None) -> Tuple[
+    def _start_end_time(self, duration: timedelta, start: datetime = None, previous: Entry = None) -> Tuple[
         datetime, datetime]:
         # user may have provided a start time, that's why we check for
         # start if start else ...
-        if self.empty:
-            current = start if start else Schedule._now()
-            return current, current + duration
-
-        # Allows the user to insert an entry at a specified index,
-        # otherwise defaults to last entry
-        return (start if start else self._previous_entry(previous_entry_index).end_time,
-                (start if start else self._previous_entry(previous_entry_index).end_time) + duration)
-
-    def _spare_time_or_overlap(self, duration: timedelta, start: datetime = None,
-                               previous_entry_index: int = None) -> SignedTimedelta:
-        start_time, end_time = self._start_end_time(
-            duration, start, previous_entry_index)
+        if start:
+            current = start
+        # Allows the user to insert an entry after a specified entry,
+        # the very first entry starts right now
+        elif previous is not None:
+            current = previous.end_time
+        else:
+            current = self._first_start_time()
+        return current, current + duration
 
+    def _spare_time_or_overlap(self, start_time: datetime, previous: Entry = None) -> SignedTimedelta:
         # detect overlap or spare time between this and previous entry
-        if self.empty:
+        if previous is None:
             result: SignedTimedelta = SignedTimedelta.zero()
         else:
             overlap = is_overlap(
-                previous=self._previous_entry(previous_entry_index).end_time,
+                previous=previous.end_time,
                 after=start_time)
             minutes_between = timedelta(minutes=minutes_between_entries(
-                previous=self._previous_entry(previous_entry_index).end_time,
+                previous=previous.end_time,
                 after=start_time))
             result: SignedTimedelta = SignedTimedelta.negative(
                 minutes_between) if overlap else SignedTimedelta.positive(minutes_between)
@@ -355,12 +846,10 @@ class Schedule:
         return result
 
     def _make_entry(self, name: str, duration: timedelta, start: datetime = None,
-                    previous_entry_index: int = None) -> Entry:
-        start_time, end_time = self._start_end_time(
-            duration, start, previous_entry_index)
+                    previous: Entry = None) -> Entry:
+        start_time, end_time = self._start_end_time(duration, start, previous)
 
-        signed_timedelta = self._spare_time_or_overlap(
-            duration, start, previous_entry_index)
+        signed_timedelta = self._spare_time_or_overlap(start_time, previous)
 
         return Entry(name,
                      start_time,
@@ -369,52 +858,193 @@ class Schedule:
                      signed_timedelta,
                      True if start else False)
 
-    def _propagate_time_changes(self, index: int):
-        already_up_to_date: List[Entry] = self._entries[:index]
-        to_be_updated: List[Entry] = self._entries[index:]
-        self._entries = already_up_to_date
-        for entry in to_be_updated:
+    def _propagate_time_changes(self, outdated: List[Tuple[Entry, Union[int, None]]]):
+        # Time again the given entries (with their sources) in order, just like appending them
+        # one by one would: each entry follows the entry starting last so far, and entries
+        # pushed past a fixed entry are moved after it.
+        # The extra time of every entry depends on the one it follows: they are all timed again
+        for entry, source in outdated:
             # start_time of fixed entries must not change, even after updating and at the risk
             # of overlapping
-            self.append(entry.name, entry.duration, entry.start_time if entry.fixed else None)
+            self._append(entry.name, entry.duration, entry.start_time if entry.fixed else None, source)
+
+    def _insertion_index(self, entry: Entry) -> int:
+        # entries sharing the same start_time keep their insertion order,
+        # just like a stable sort would do
+        return bisect_right(self._entries, entry._start, key=attrgetter('_start'))
 
-    def _sort(self):
-        self._entries = sorted(self._entries, key=lambda entry: entry.start_time)
+    def _add(self, index: int, entry: Entry, source: int = None):
+        self._entries.insert(index, entry)
+        self._sources.insert(index, source)
+        self._total_duration += entry._duration
+
+    def _append(self, name: str, duration: timedelta, start: datetime = None, source: int = None) -> Entry:
+        result: Entry = self._make_entry(name, duration, start, None if self.empty else self.last)
+        self._add(self._insertion_index(result), result, source)
+        return result
+
+    def _insert(self, index: int, name: str, duration: timedelta, start: datetime = None,
+                source: int = None) -> Entry:
+        # The new entry follows the entries before 'index' (or is placed by its start_time, if fixed),
+        # then the following entries are timed again after it
+        outdated: List[Tuple[Entry, Union[int, None]]] = list(zip(self._entries[index:], self._sources[index:]))
+        del self._entries[index:]
+        del self._sources[index:]
+        self._total_duration -= sum(entry._duration for entry, _ in outdated)
+        result: Entry = self._append(name, duration, start, source)
+        self._propagate_time_changes(outdated)
+        return result
+
+    def _retime_lines(self, lines: List[ParsableEntryType], line_ids: List[Union[int, None]], first: int,
+                      parser: Parser):
+        # Entries depend on the lines before them only: keep the entries of the lines before
+        # 'first' and append the following ones again, just like 'from_entries' does
+        kept = set(line_ids[:first])
+        kept_entries = [(entry, source) for entry, source in zip(self._entries, self._sources)
+                        if source is None or source in kept]
+        self._entries = [entry for entry, _ in kept_entries]
+        self._sources = [source for _, source in kept_entries]
+        self._total_duration = sum(entry._duration for entry in self._entries)
+        for j in range(first, len(lines)):
+            start_time = self._first_start_time() if self.empty else self.last.start_time
+            if line_ids[j] is None:
+                name, duration, start = parser.parse(lines[j], start_time=start_time)
+                line_ids[j] = self._next_line_id
+                self._next_line_id = self._next_line_id + 1
+                self._parsed[line_ids[j]] = name, duration, start.time() if start else None
+            else:
+                # lines that did not change are not parsed again
+                name, duration, at = self._parsed[line_ids[j]]
+                start = combine_at(at, start_time) if at else None
+            self._append(name, duration, start, source=line_ids[j])
 
     # USER METHODS TO HANDLE ENTRIES
 
     def append(self, name: str, duration: timedelta, start: datetime = None) -> Entry:
-        result: Entry = self._make_entry(name, duration, start)
-        self._entries.append(result)
-        self._sort()
-        return result
+        return self._append(name, duration, start)
 
     def insert(self, index: int, name: str, duration: timedelta, start: datetime = None) -> Entry:
-        result: Entry = self._make_entry(name, duration, start, index - 1 if index > 0 else None)
-        self._entries.insert(index, result)
-        self._propagate_time_changes(index)
-        self._sort()
-        return result
+        return self._insert(index, name, duration, start)
+
+    def update(self, *entries: Generic[ParsableEntryType], parser: Parser[Generic[ParsableEntryType]]) -> "Schedule":
+        """
+
+        Args:
+            entries: all the entries the schedule is made of now, e.g. the lines of an edited entries file
+            parser: the parser the schedule was made with
+
+        Returns:
+            this schedule, the same as 'from_entries' would make, where only inserted or edited
+            entries are parsed. Entries of the lines before the first inserted, removed or edited
+            one keep their times, the following ones are timed again
+        """
+        lines = [e for e in entries if parser.is_parsable(e)]
+        opcodes = SequenceMatcher(None, self._lines, lines, autojunk=False).get_opcodes()
+        parser.prefetch([line for tag, _, _, j1, j2 in opcodes if tag != 'equal' for line in lines[j1:j2]])
+        # the id of every line, None for lines still to be parsed
+        line_ids: List[Union[int, None]] = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == 'equal':
+                line_ids.extend(self._line_ids[i1:i2])
+                continue
+            # 'delete', 'insert' or 'replace' (that is both)
+            for line_id in self._line_ids[i1:i2]:
+                del self._parsed[line_id]
+            line_ids.extend([None] * (j2 - j1))
+        first_change = next((j1 for tag, _, _, j1, _ in opcodes if tag != 'equal'), None)
+        if first_change is not None:
+            self._retime_lines(lines, line_ids, first_change, parser)
+        self._lines = lines
+        self._line_ids = line_ids
+        return self
 
     # OTHER USER METHODS
 
+    def next_boundary(self, after: datetime) -> Union[datetime, None]:
+        # the schedule looks different as soon as one of its entries starts or ends
+        after_us = _microseconds(after - Entry.EPOCH)
+        boundaries = [t for entry in self._entries for t in (entry._start, entry._end) if t > after_us]
+        return Entry.EPOCH + timedelta(microseconds=min(boundaries)) if boundaries else None
+
+    def to_columnar(self):
+        # numpy is only needed by the columnar representation
+        from punctual._columnar import ColumnarSchedule
+        return ColumnarSchedule.from_schedule(self)
+
+    def to_jsonl(self, file: TextIO):
+        # machine-readable formats are loaded back with 'load_jsonl', 'load_csv' and 'load_npz'
+        # of 'punctual._serialize', without parsing entries again
+        from punctual._serialize import dump_jsonl
+        dump_jsonl(self._entries, file)
+
+    def to_csv(self, file: TextIO):
+        from punctual._serialize import dump_csv
+        dump_csv(self._entries, file)
+
+    def to_npz(self, file: Union[str, BinaryIO]):
+        from punctual._serialize import dump_npz
+        dump_npz(self._entries, file)
+
+    def lines(self) -> Iterator[str]:
+        # The same report as 'prettify_report', rendered line by line straight from the entries.
+        # Only tables the fast renderer cannot reproduce exactly are left to tabulate
+        from punctual._render import ReportRenderer, is_supported
+        if is_supported([entry.name for entry in self._entries], self._tablefmt):
+            self._raise_error_if_empty()
+            yield from ReportRenderer(self._tablefmt).report(self._entries, self.minutes)
+        else:
+            yield from prettify_report(self.__dict__(), tablefmt=self._tablefmt).split('\n')
+
     def to_clipboard(self):
+        # the clipboard is only needed here
+        import pyperclip
         pyperclip.copy(self.__str__())
 
 
-def punctual(entries: List[str],
-             usr_synonyms: List[Tuple[str, int]],
-             online: bool = False,
-             contingency_in_minutes: int = 2,
-             tablefmt: str = 'default') -> Schedule:
+def new_parser(usr_synonyms: List[Tuple[str, int]],
+               online: bool = False,
+               contingency_in_minutes: int = 2,
+               max_workers: int = 8,
+               history_files: List[str] = None,
+               parse_cache: ParseCache = None,
+               cache_dir: str = None) -> StandardParser:
+
+    estimator = None
+    if history_files:
+        # numpy is only needed by the local estimator
+        from punctual._estimator import LocalDurationEstimator
+        estimator = LocalDurationEstimator.from_files(*history_files, synonyms=usr_synonyms)
 
     standard_parser: StandardParser = StandardParser(
             synonyms=usr_synonyms,
-            contingency=timedelta(minutes=contingency_in_minutes))
+            contingency=timedelta(minutes=contingency_in_minutes),
+            max_workers=max_workers,
+            estimator=estimator,
+            parse_cache=parse_cache,
+            cache_dir=cache_dir)
 
     if online:
         standard_parser.toggle_online_parsers()
 
+    return standard_parser
+
+
+def punctual(entries: List[str],
+             usr_synonyms: List[Tuple[str, int]],
+             online: bool = False,
+             contingency_in_minutes: int = 2,
+             tablefmt: str = 'default',
+             max_workers: int = 8,
+             history_files: List[str] = None,
+             parse_cache: ParseCache = None) -> Schedule:
+
+    standard_parser: StandardParser = new_parser(usr_synonyms=usr_synonyms,
+                                                 online=online,
+                                                 contingency_in_minutes=contingency_in_minutes,
+                                                 max_workers=max_workers,
+                                                 history_files=history_files,
+                                                 parse_cache=parse_cache)
+
     return Schedule.from_entries(*entries, parser=standard_parser, tablefmt=tablefmt)
 
 
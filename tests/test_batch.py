@@ -0,0 +1,83 @@
+import pickle
+
+from datetime import datetime
+from datetime import timedelta
+
+from punctual.new_core import Schedule
+from punctual._batch import batch
+from punctual.batch_cli import main
+from punctual._serialize import load_jsonl
+
+
+# TEST METHODS
+
+
+def test_schedules_are_sent_across_processes():
+    # given
+    schedule: Schedule = Schedule(tablefmt='simple_grid')
+    schedule.append('Shower', timedelta(minutes=20), datetime(2024, 5, 31, 8))
+
+    # when
+    copy: Schedule = pickle.loads(pickle.dumps(schedule))
+
+    # then
+    assert copy._entries == schedule._entries
+    assert str(copy) == str(schedule)
+
+
+def test_batch_computes_a_schedule_per_entries_file(tmp_path):
+    # given
+    start_time = datetime(2024, 5, 31, 8)
+    entries_files = []
+    for user, entries in [('alice', 'Shower\n25m\n'), ('bob', '# morning\nClean\nLunch 30m; 12:00\n'), ('carol', '')]:
+        entries_file = tmp_path / f'{user}.txt'
+        entries_file.write_text(entries)
+        entries_files.append(str(entries_file))
+    usr_synonyms = [('Shower', 20), ('Clean', 10)]
+
+    # when
+    inline = batch(entries_files, usr_synonyms, max_workers=1, cache_dir=str(tmp_path), start_time=start_time)
+    pooled = batch(entries_files, usr_synonyms, max_workers=2, cache_dir=str(tmp_path), start_time=start_time)
+
+    # then
+    assert list(pooled.schedules) == entries_files
+    assert pooled.schedules[entries_files[0]].minutes == 22 + 27
+    assert pooled.schedules[entries_files[0]].start == start_time
+    assert len(pooled.schedules[entries_files[2]]) == 0
+    for entries_file in entries_files:
+        assert pooled.schedules[entries_file]._entries == inline.schedules[entries_file]._entries
+    assert set(pooled.timings) == set(entries_files)
+    assert pooled.elapsed > 0
+
+
+def test_batch_entry_point_writes_a_jsonl_file_per_entries_file(tmp_path, capsys):
+    # given
+    entries_file = tmp_path / 'alice.txt'
+    entries_file.write_text('25m\n10m\n')
+    output_dir = tmp_path / 'schedules'
+
+    # when
+    main([str(entries_file), '--workers', '1', '--output_dir', str(output_dir)])
+
+    # then
+    with open(output_dir / 'alice.jsonl', 'r') as f:
+        assert load_jsonl(f).minutes == 27 + 12
+    assert capsys.readouterr().out.startswith('1 schedules computed in ')
+
+
+def test_batch_entry_point_prints_every_schedule_even_empty_ones(tmp_path, capsys):
+    # given
+    entries_files = []
+    for user, entries in [('alice', '25m\n10m\n'), ('bob', '# nothing planned\n'), ('carol', '')]:
+        entries_file = tmp_path / f'{user}.txt'
+        entries_file.write_text(entries)
+        entries_files.append(str(entries_file))
+
+    # when
+    main([*entries_files, '--workers', '1'])
+
+    # then
+    out = capsys.readouterr().out
+    assert 'Total time required: 39 minutes' in out
+    assert out.count('No entries.') == 2
+    assert '3 schedules computed in ' in out
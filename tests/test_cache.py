@@ -0,0 +1,75 @@
+import pytest
+
+from datetime import timedelta
+
+from punctual._cache import PersistentCache
+from punctual._mapbox import geocode
+from punctual._mapbox import direction_duration
+from punctual._mapbox import RoutingProfile
+
+
+# FIXTURES
+
+@pytest.fixture
+def offline(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('No remote call was expected')
+    monkeypatch.setattr('requests.request', fail)
+
+
+# TEST METHODS
+
+
+def test_values_persist_across_cache_instances(tmp_path):
+    # given
+    PersistentCache('test', directory=str(tmp_path)).set('key', ['value', [1.5, 2.5]])
+
+    # when
+    result = PersistentCache('test', directory=str(tmp_path)).get('key')
+
+    # then
+    assert result == ['value', [1.5, 2.5]]
+
+
+def test_expired_values_are_evicted(tmp_path):
+    # given
+    cache = PersistentCache('test', directory=str(tmp_path), ttl=timedelta(seconds=0))
+
+    # when
+    cache.set('key', 1)
+
+    # then
+    assert cache.get('key') is None
+    assert cache.misses == 1
+    assert len(cache) == 0
+
+
+def test_oldest_values_are_evicted_beyond_max_entries(tmp_path):
+    # given
+    cache = PersistentCache('test', directory=str(tmp_path), max_entries=2)
+
+    # when
+    for key in ['a', 'b', 'c']:
+        cache.set(key, key)
+
+    # then
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.get('c') == 'c'
+
+
+def test_mapbox_results_are_served_from_cache(tmp_path, offline):
+    # given
+    cache = PersistentCache('mapbox', directory=str(tmp_path))
+    cache.set('colosseo, roma', ['Colosseo, Rome', [12.49, 41.89]])
+    cache.set('driving:12.49,41.89;12.5,41.9', 660)
+
+    # when
+    name, coordinates = geocode('  Colosseo,  Roma ', 'token', cache)
+    duration = direction_duration([coordinates, (12.5, 41.9)], RoutingProfile.DRIVING, 'token', cache)
+
+    # then
+    assert name == 'Colosseo, Rome'
+    assert coordinates == (12.49, 41.89)
+    assert duration == timedelta(minutes=11)
+    assert cache.hits == 2
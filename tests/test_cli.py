@@ -0,0 +1,69 @@
+import os
+import sys
+from datetime import datetime
+from datetime import timedelta
+
+from punctual.cli import FileWatcher
+from punctual.cli import parse_args
+from punctual.cli import iter_entries_from_file
+from punctual.cli import wait_for_changes
+
+
+# TEST METHODS
+
+
+def test_file_watcher_tells_changed_files(tmp_path):
+    # given
+    entries_file = tmp_path / 'entries.txt'
+    synonyms_file = tmp_path / 'synonyms.txt'
+    entries_file.write_text('Shower\n')
+    synonyms_file.write_text('Shower, 20\n')
+    watcher = FileWatcher(str(entries_file), str(synonyms_file), None)
+
+    # when
+    unchanged = watcher.changed()
+    stat = os.stat(synonyms_file)
+    os.utime(synonyms_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    # then
+    assert unchanged == []
+    assert watcher.changed() == [str(synonyms_file)]
+    assert watcher.changed() == []
+
+
+def test_wait_for_changes_stops_at_deadline(tmp_path):
+    # given
+    entries_file = tmp_path / 'entries.txt'
+    entries_file.write_text('Shower\n')
+    watcher = FileWatcher(str(entries_file))
+
+    # when
+    changed = wait_for_changes(watcher, datetime.now() - timedelta(seconds=1))
+
+    # then
+    assert changed == []
+
+
+def test_entries_are_read_lazily_skipping_blank_lines_and_comments(tmp_path):
+    # given
+    entries_file = tmp_path / 'entries.txt'
+    entries_file.write_text('# morning\nShower\n\n  Clean  \n#Lunch\n25m\n')
+
+    # when
+    entries = iter_entries_from_file(str(entries_file))
+
+    # then
+    assert next(entries) == 'Shower'
+    assert list(entries) == ['Clean', '25m']
+
+
+def test_an_entries_file_named_batch_is_an_entries_file(monkeypatch):
+    # given
+    monkeypatch.setattr(sys, 'argv', ['punctual', 'batch', '--contingency', '5'])
+
+    # when
+    args = parse_args()
+
+    # then
+    assert args.entries_file == 'batch'
+    assert args.contingency == 5
@@ -0,0 +1,60 @@
+from datetime import datetime
+from datetime import timedelta
+
+import numpy as np
+
+from punctual._columnar import ColumnarSchedule
+from punctual.new_core import Schedule
+
+
+# TEST METHODS
+
+
+def test_from_parsed_computes_the_same_timing_as_schedule():
+    # given
+    parsed = [
+        ('shower', timedelta(minutes=20), datetime(2024, 5, 23, 14, 0)),
+        ('30m', timedelta(minutes=30), None),
+        ('lunch', timedelta(minutes=40), datetime(2024, 5, 23, 15, 0)),
+        ('snack', timedelta(minutes=10), None),
+        ('late', timedelta(minutes=5), datetime(2024, 5, 23, 15, 45)),
+        # fixed entries starting before the ones above, the following entries
+        # still come after the entry starting last
+        ('breakfast', timedelta(minutes=15), datetime(2024, 5, 23, 8, 0)),
+        ('15m', timedelta(minutes=15), None),
+        ('same start', timedelta(minutes=5), datetime(2024, 5, 23, 15, 45)),
+        ('earlier', timedelta(minutes=30), datetime(2024, 5, 23, 15, 30)),
+        ('5m', timedelta(minutes=5), None),
+    ]
+    expected: Schedule = Schedule.from_parsed(parsed)
+
+    # when
+    result: ColumnarSchedule = ColumnarSchedule.from_parsed(parsed)
+
+    # then
+    assert result.names.tolist() == [e.name for e in expected._entries]
+    assert result.start_times.tolist() == [e.start_time for e in expected._entries]
+    assert result.end_times.tolist() == [e.end_time for e in expected._entries]
+    assert [str(extra) for extra in result.extras] == [str(e.extra) for e in expected._entries]
+    assert result.minutes == expected.minutes
+    assert result.start == expected.start
+    assert result.end == expected.end
+    assert result.to_schedule()._entries == expected._entries
+
+
+def test_gaps_are_negative_on_overlaps():
+    # given
+    schedule: Schedule = Schedule.from_parsed([
+        ('a', timedelta(minutes=30), datetime(2024, 5, 23, 10, 0)),
+        ('b', timedelta(minutes=10), datetime(2024, 5, 23, 10, 20)),
+        ('c', timedelta(minutes=10), datetime(2024, 5, 23, 11, 0)),
+    ])
+
+    # when
+    result: ColumnarSchedule = schedule.to_columnar()
+
+    # then
+    assert result.gaps.tolist() == [timedelta(0), timedelta(minutes=-10), timedelta(minutes=30)]
+    assert [str(extra) for extra in result.extras] == ['', '- 0:10:00', '+ 0:30:00']
+    assert result.fixed.dtype == np.bool_
+    assert [e.name for e in result.to_schedule()._entries] == ['a', 'b', 'c']
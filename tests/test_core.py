@@ -0,0 +1,37 @@
+import pytest
+
+from datetime import datetime
+from datetime import time
+
+from punctual.core import tokenize_entry
+from punctual.core import parse_entry
+from punctual.core import ParsedEntry
+
+
+# TEST METHODS
+
+
+def test_tokenize_entry_with_duration_and_start_time():
+    # when
+    result: ParsedEntry = tokenize_entry(' 1h33m ; 9:05 ')
+
+    # then
+    assert result == ParsedEntry('1h33m', time(9, 5), 93, None)
+    assert result.key == '1h33m'
+
+
+def test_tokenize_direction():
+    # when
+    result: ParsedEntry = tokenize_entry('Rome -> Milan')
+
+    # then
+    assert result.is_direction
+    assert result.locations == ('rome', 'milan')
+    assert result.key == 'milan - rome'
+    assert result.minutes == 0
+
+
+@pytest.mark.parametrize('entry', ['shower; 25:00', 'shower; noon', 'shower; 14:00; 15:00'])
+def test_invalid_entries_are_rejected(entry: str):
+    with pytest.raises(ValueError):
+        parse_entry(entry, datetime(2024, 5, 23, 13, 29))
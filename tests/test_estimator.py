@@ -0,0 +1,62 @@
+import pytest
+
+from datetime import datetime
+from datetime import timedelta
+
+from punctual._estimator import LocalDurationEstimator
+from punctual.new_core import StandardParser
+
+
+# TEST METHODS
+
+
+def test_estimator_is_trained_from_past_entries_files(tmp_path):
+    # given
+    entries_file = tmp_path / 'entries.txt'
+    entries_file.write_text('# yesterday\n'
+                            '20m # get up\n'
+                            'Cleaning the kitchen\n'
+                            '45m\n'
+                            'Walking the dog; 18:00\n')
+    synonyms = [('Cleaning the kitchen', 15), ('Walking the dog', 30)]
+
+    # when
+    estimator = LocalDurationEstimator.from_files(str(entries_file), synonyms=synonyms)
+
+    # then
+    assert len(estimator) == 3
+    assert estimator.estimate('kitchen cleaning') == (15, pytest.approx(1))
+    assert estimator.estimate('Get up') == (20, pytest.approx(1))
+    minutes, confidence = estimator.estimate('walking')
+    assert minutes == 30
+    assert 0 < confidence < 1
+    assert estimator.estimate('Reading')[1] == 0
+
+
+def test_durations_along_with_words_are_labelled_by_them_and_malformed_entries_skipped():
+    # when
+    result = LocalDurationEstimator.samples_from_entries(['Lunch 30m; 12:00',
+                                                          'Walk the dog 45m',
+                                                          '1h20m',
+                                                          'x; 25:00',
+                                                          'Shower'],
+                                                         synonyms=[('Shower', 20)])
+
+    # then
+    assert result == [('Lunch', 30), ('Walk the dog', 45), ('Shower', 20)]
+
+
+def test_standard_parser_estimates_unknown_entries_locally():
+    # given
+    estimator = LocalDurationEstimator().fit([('Cleaning the kitchen', 15), ('Walking the dog', 30)])
+    parser = StandardParser(synonyms=[('Shower', 20)], contingency=timedelta(minutes=3), estimator=estimator)
+
+    # when
+    known = parser.parse('Shower', start_time=datetime(2024, 5, 23, 13, 29))
+    estimated = parser.parse('kitchen cleaning; 14:00', start_time=datetime(2024, 5, 23, 13, 29))
+    unknown = parser.parse('Reading', start_time=datetime(2024, 5, 23, 13, 29))
+
+    # then
+    assert known == ('Shower', timedelta(minutes=23), None)
+    assert estimated == ('kitchen cleaning', timedelta(minutes=18), datetime(2024, 5, 23, 14, 0))
+    assert unknown == ('Reading', timedelta(minutes=3), None)
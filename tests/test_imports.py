@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+
+# TEST METHODS
+
+
+def test_offline_modules_do_not_import_online_providers_clipboard_nor_tables():
+    # given
+    code = ("import sys, punctual, punctual.cli, punctual.new_core; "
+            "print(','.join(m for m in ('openai', 'requests', 'pyperclip', 'tabulate', 'numpy') if m in sys.modules))")
+
+    # when
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    # then
+    assert result.stdout.strip() == ''
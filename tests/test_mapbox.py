@@ -0,0 +1,186 @@
+import os
+import pytest
+
+from typing import Tuple
+
+from json import dumps
+from datetime import datetime
+from datetime import timedelta
+from threading import Thread
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import unquote
+from urllib.parse import urlparse
+
+import requests
+
+from punctual.new_core import MapboxParser
+from punctual._mapbox import geocode
+from punctual._mapbox import duration_matrix
+from punctual._mapbox import direction_duration
+from punctual._mapbox import new_session
+from punctual._mapbox import RoutingProfile
+
+
+class StubResponse:
+
+    def __init__(self, body: dict):
+        self._body = body
+        self.parsed = 0
+
+    def json(self) -> dict:
+        self.parsed = self.parsed + 1
+        return self._body
+
+
+class StubSession:
+
+    def __init__(self, *bodies: dict):
+        self.responses = [StubResponse(body) for body in bodies]
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses[len(self.requests) - 1]
+
+
+# FIXTURES
+
+@pytest.fixture
+def profile(monkeypatch):
+    monkeypatch.setenv('PUNCTUAL_PROFILE', os.path.join(os.path.dirname(__file__), '..', 'example', 'profile.json'))
+
+
+@pytest.fixture
+def mapbox(monkeypatch) -> list:
+    # every request reaching the (fake) network is recorded
+    urls = []
+
+    def send(adapter, request, **kwargs):
+        urls.append(request.url)
+        if '/geocoding/' in request.url:
+            location = request.url.split('/')[-1].split('.json')[0]
+            body = {'features': [{'place_name': f'Matched {requests.utils.unquote(location)}', 'center': [12.0, 41.0]}]}
+        else:
+            body = {'routes': [{'duration': 600}]}
+        response = requests.Response()
+        response.status_code = 200
+        response._content = dumps(body).encode()
+        response.request = request
+        response.url = request.url
+        return response
+
+    monkeypatch.setattr('requests.adapters.HTTPAdapter.send', send)
+    return urls
+
+
+@pytest.fixture
+def stub_server() -> Tuple[str, list]:
+    # a local server answering as Mapbox would: every place is on a line,
+    # travelling from place 'i' to place 'j' takes |i - j| * 10 minutes
+    paths = []
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            path = unquote(urlparse(self.path).path)
+            paths.append(path)
+            if path.startswith('/geocoding/'):
+                place = path.split('/')[-1][:-len('.json')]
+                body = {'features': [{'place_name': place.title(), 'center': [float(ord(place[-1]) - ord('a')), 0.0]}]}
+            elif path.startswith('/directions-matrix/'):
+                points = [float(point.split(',')[0]) for point in path.split('/')[-1].split(';')]
+                body = {'code': 'Ok', 'durations': [[abs(i - j) * 600 for j in points] for i in points]}
+            else:
+                body = {'routes': [{'duration': 3600}]}
+            content = dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}', paths
+    server.shutdown()
+
+
+# TEST METHODS
+
+
+def test_new_session_pools_and_retries_connections():
+    # when
+    session = new_session(pool_size=4, retries=2)
+
+    # then
+    adapter = session.get_adapter('https://api.mapbox.com')
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+
+
+def test_requests_go_through_the_session_and_are_parsed_once():
+    # given
+    session = StubSession({'features': [{'place_name': 'Colosseo, Rome', 'center': [12.49, 41.89]}]},
+                          {'routes': [{'duration': 660}]})
+
+    # when
+    name, coordinates = geocode('Colosseo, Rome (session)', 'token', session=session, timeout=3)
+    duration = direction_duration([coordinates, (12.5, 41.9)], RoutingProfile.DRIVING, 'token', session=session)
+
+    # then
+    assert (name, coordinates, duration) == ('Colosseo, Rome', (12.49, 41.89), timedelta(minutes=11))
+    assert [response.parsed for response in session.responses] == [1, 1]
+    assert session.requests[0][2]['timeout'] == 3
+
+
+def test_mapbox_parser_geocodes_each_location_once(profile, mapbox, tmp_path):
+    # given
+    parser = MapboxParser(cache_dir=str(tmp_path))
+
+    # when
+    name, duration, start = parser.parse('Home ->  Office Tower ', start_time=datetime(2024, 5, 23, 13, 29))
+    parser.parse('HOME -> office tower; 15:00', start_time=datetime(2024, 5, 23, 13, 29))
+
+    # then
+    assert name == 'Matched home\nMatched office tower'
+    assert duration == timedelta(minutes=10)
+    assert start is None
+    # two geocoding requests and one directions request
+    assert parser.remote_calls == 3
+    assert len(mapbox) == 3
+
+
+def test_duration_matrix_fetches_all_durations_with_one_request(stub_server):
+    # given
+    base_url, paths = stub_server
+
+    # when
+    result = duration_matrix([(0.0, 0.0), (1.0, 0.0), (3.0, 0.0)], RoutingProfile.WALKING, 'token', base_url=base_url)
+
+    # then
+    assert result[0] == [timedelta(0), timedelta(minutes=10), timedelta(minutes=30)]
+    assert result[2][1] == timedelta(minutes=20)
+    assert paths == ['/directions-matrix/v1/mapbox/walking/0.0,0.0;1.0,0.0;3.0,0.0']
+
+
+def test_mapbox_parser_serves_all_trips_from_one_matrix_request(profile, stub_server, tmp_path):
+    # given
+    base_url, paths = stub_server
+    parser = MapboxParser(cache_dir=str(tmp_path), base_url=base_url)
+    entries = ['Place a -> Place b', 'Place b -> Place d', 'place d -> place a; 18:00', 'Place a -> Place b']
+
+    # when
+    parser.prefetch(entries)
+    result = [parser.parse(entry, start_time=datetime(2024, 5, 23, 13, 29)) for entry in entries]
+
+    # then
+    assert [duration for _, duration, _ in result] == [timedelta(minutes=10), timedelta(minutes=20),
+                                                       timedelta(minutes=30), timedelta(minutes=10)]
+    assert result[0][0] == 'Place A\nPlace B'
+    assert len([path for path in paths if path.startswith('/geocoding/')]) == 3
+    assert len([path for path in paths if path.startswith('/directions-matrix/')]) == 1
+    assert len(paths) == 4
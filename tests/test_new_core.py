@@ -1,7 +1,13 @@
+import os
+import random
+import threading
+import time
 import pytest
 
 from datetime import datetime
 from datetime import timedelta
+from typing import Tuple
+from typing import Union
 
 from punctual.new_core import punctual
 from punctual.new_core import Schedule
@@ -9,6 +15,42 @@ from punctual.new_core import StandardParser
 from punctual.new_core import TripDurationProvider
 from punctual.new_core import MapboxParser
 from punctual.new_core import OpenAIGuessParser
+from punctual.new_core import Parser
+from punctual.new_core import ParseCache
+from punctual.new_core import load_profile
+from punctual.core import parse_entry
+
+
+class SlowRemoteParser(Parser):
+    remote = True
+
+    def __init__(self, directions_only: bool = False, concurrent: int = 1):
+        self.parsed = []
+        self._directions_only = directions_only
+        # with more than one, every parse waits for as many parses to be in progress at the same time
+        # (and fails after a while otherwise)
+        self._barrier = threading.Barrier(concurrent, timeout=5) if concurrent > 1 else None
+        self._lock = threading.Lock()
+        self._in_progress = 0
+        # the most parses in progress at the same time
+        self.peak = 0
+
+    def is_parsable(self, entry: str) -> bool:
+        return not entry.startswith('#') and (' -> ' in entry or not self._directions_only)
+
+    def parse(self, entry: str, **kwargs) -> Tuple[str, timedelta, Union[datetime, None]]:
+        with self._lock:
+            self._in_progress = self._in_progress + 1
+            self.peak = max(self.peak, self._in_progress)
+        if self._barrier is not None:
+            self._barrier.wait()
+        else:
+            time.sleep(0.2)
+        with self._lock:
+            self._in_progress = self._in_progress - 1
+        self.parsed.append(entry)
+        entry_name, at = parse_entry(entry, kwargs.get('start_time'))
+        return entry_name.upper(), timedelta(minutes=5), at
 
 
 # FIXTURES
@@ -158,4 +200,374 @@ def test_parse_unknown_entry_guessing_duration_with_openai(standard_parser: Stan
     # then
     assert name == 'Having lunch with friends'
     assert duration == timedelta(seconds=1380)
-    assert start is None
\ No newline at end of file
+    assert start is None
+
+def test_append_keeps_entries_ordered_by_start_time():
+    # given
+    schedule: Schedule = Schedule()
+    schedule.append('first', timedelta(minutes=30), datetime(2024, 5, 23, 14, 0))
+    schedule.append('second', timedelta(minutes=10))
+
+    # when
+    schedule.append('earlier', timedelta(minutes=5), datetime(2024, 5, 23, 13, 0))
+    schedule.append('same start', timedelta(minutes=5), datetime(2024, 5, 23, 14, 0))
+
+    # then
+    assert [e.name for e in schedule._entries] == ['earlier', 'first', 'same start', 'second']
+    assert schedule.first.name == 'earlier'
+    assert schedule.last.name == 'second'
+    assert schedule.start == datetime(2024, 5, 23, 13, 0)
+    assert schedule.end == datetime(2024, 5, 23, 14, 40)
+
+
+def test_insert_shifts_following_entries_up_to_the_first_fixed_one():
+    # given
+    schedule: Schedule = Schedule()
+    schedule.append('a', timedelta(minutes=30), datetime(2024, 5, 23, 10, 0))
+    schedule.append('b', timedelta(minutes=10))
+    schedule.append('fixed', timedelta(minutes=10), datetime(2024, 5, 23, 11, 0))
+    schedule.append('c', timedelta(minutes=10))
+
+    # when
+    inserted = schedule.insert(1, 'breakfast', timedelta(minutes=12))
+
+    # then
+    assert inserted.start_time == datetime(2024, 5, 23, 10, 30)
+    assert [(e.name, e.start_time.strftime('%H:%M'), e.end_time.strftime('%H:%M'), str(e.extra))
+            for e in schedule._entries] == [
+        ('a', '10:00', '10:30', ''),
+        ('breakfast', '10:30', '10:42', ''),
+        ('b', '10:42', '10:52', ''),
+        ('fixed', '11:00', '11:10', '+ 0:08:00'),
+        ('c', '11:10', '11:20', ''),
+    ]
+
+
+def test_insert_moves_entries_pushed_past_a_fixed_one(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 23, 10, 0)))
+    schedule: Schedule = Schedule()
+    schedule.append('a', timedelta(minutes=30))
+    schedule.append('b', timedelta(minutes=5))
+    schedule.append('fixed', timedelta(minutes=20), datetime(2024, 5, 23, 10, 40))
+    schedule.append('c', timedelta(minutes=10))
+
+    # when
+    schedule.insert(1, 'breakfast', timedelta(minutes=60))
+
+    # then
+    assert [(e.name, e.start_time.strftime('%H:%M'), e.end_time.strftime('%H:%M'))
+            for e in schedule._entries] == [
+        ('a', '10:00', '10:30'),
+        ('breakfast', '10:30', '11:30'),
+        ('fixed', '10:40', '11:00'),
+        ('b', '11:30', '11:35'),
+        ('c', '11:35', '11:45'),
+    ]
+    assert schedule.end == datetime(2024, 5, 23, 11, 45)
+    assert len(schedule._sources) == len(schedule._entries)
+
+
+def test_insert_places_a_fixed_entry_by_its_start_time():
+    # given
+    schedule: Schedule = Schedule()
+    schedule.append('a', timedelta(minutes=30), datetime(2024, 5, 23, 11, 0))
+
+    # when
+    schedule.insert(1, 'b', timedelta(hours=1), datetime(2024, 5, 23, 10, 0))
+    schedule.append('c', timedelta(minutes=5))
+
+    # then
+    assert [e.name for e in schedule._entries] == ['b', 'a', 'c']
+    assert schedule.first.name == 'b'
+    assert schedule.start == datetime(2024, 5, 23, 10, 0)
+    assert schedule._entries[-1].start_time == datetime(2024, 5, 23, 11, 30)
+
+
+def test_insert_times_again_the_following_entries_as_if_appended_after_it(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 23, 9, 0)))
+    appended = [('x', timedelta(minutes=30), datetime(2024, 5, 23, 11, 0)),
+                ('y', timedelta(minutes=30), datetime(2024, 5, 23, 10, 20)),
+                ('z', timedelta(minutes=15), None)]
+    schedule: Schedule = Schedule()
+    for name, duration, start in appended:
+        schedule.append(name, duration, start)
+    following = [(e.name, e.duration, e.start_time if e.fixed else None) for e in schedule._entries]
+
+    # when
+    schedule.insert(0, 'fixed', timedelta(minutes=20), datetime(2024, 5, 23, 9, 30))
+
+    # then
+    expected: Schedule = Schedule()
+    for name, duration, start in [('fixed', timedelta(minutes=20), datetime(2024, 5, 23, 9, 30)), *following]:
+        expected.append(name, duration, start)
+    assert schedule._entries == expected._entries
+    assert [str(e.extra) for e in schedule._entries] == ['', '+ 0:30:00', '+ 0:10:00', '']
+
+
+def test_from_parsed_builds_the_same_entries_as_appending_them(standard_parser: StandardParser):
+    # given
+    start_time = datetime(2024, 5, 23, 13, 29, 0)
+    parsed = [standard_parser.parse(entry, start_time=start_time)
+              for entry in ['Shower; 14:00', '30m', 'snack; 14:10', 'Rome -> Milan', '1h; 14:05']]
+    appended: Schedule = Schedule()
+    for name, duration, start in parsed:
+        appended.append(name, duration, start)
+
+    # when
+    result: Schedule = Schedule.from_parsed(parsed)
+
+    # then
+    assert [(e.name, e.start_time, e.end_time, e.duration, str(e.extra), e.fixed) for e in result._entries] == \
+           [(e.name, e.start_time, e.end_time, e.duration, str(e.extra), e.fixed) for e in appended._entries]
+
+
+def test_entries_are_compact_and_totals_are_kept_up_to_date():
+    # given
+    schedule: Schedule = Schedule.from_names('a', 'b', duration=timedelta(minutes=15),
+                                             start=datetime(2024, 5, 23, 10, 0))
+
+    # when
+    schedule.insert(1, 'c', timedelta(minutes=30))
+
+    # then
+    assert not hasattr(schedule.first, '__dict__')
+    assert not hasattr(schedule.first.extra, '__dict__')
+    assert schedule.minutes == 60
+    assert [(key, str(value)) for key, value in schedule.first._asdict().items()] == [
+        ('name', 'a'),
+        ('start_time', '2024-05-23 10:00:00'),
+        ('end_time', '2024-05-23 10:15:00'),
+        ('duration', '0:15:00'),
+        ('extra', ''),
+        ('fixed', 'True')
+    ]
+
+
+def test_remote_entries_are_resolved_concurrently(standard_parser: StandardParser):
+    # given
+    remote_parser = SlowRemoteParser(concurrent=4)
+    standard_parser.__dict__['mapbox_parser'] = SlowRemoteParser(directions_only=True)
+    standard_parser.__dict__['open_ai_guess_parser'] = remote_parser
+    standard_parser.toggle_online_parsers()
+    entries = ['Shower; 14:00', 'a', 'b', 'Home -> Office', 'd; 15:00', 'e', 'snack']
+
+    # when
+    result: Schedule = Schedule.from_entries(*entries, parser=standard_parser)
+
+    # then
+    # the four remote entries have all been parsed at the same time
+    assert remote_parser.peak == 4
+    assert sorted(remote_parser.parsed) == ['a', 'b', 'd; 15:00', 'e']
+    assert [e.name for e in result._entries] == ['Shower', 'A', 'B', 'HOME -> OFFICE', 'D', 'E', 'snack']
+    assert result._entries[4].start_time.strftime('%H:%M') == '15:00'
+
+
+def test_entries_are_parsed_once_by_the_matching_parser(standard_parser: StandardParser, monkeypatch):
+    # given
+    parsed = []
+    fallback_parser = standard_parser.default_parser._parser
+    parse = fallback_parser.parse
+
+    def counting_parse(entry, **kwargs):
+        parsed.append(entry)
+        return parse(entry, **kwargs)
+
+    monkeypatch.setattr(fallback_parser, 'parse', counting_parse)
+
+    # when
+    Schedule.from_entries('Shower; 14:00', '30m', 'Rome -> Milan', 'unknown', parser=standard_parser)
+    standard_parser.parse('Shower', start_time=datetime(2024, 5, 23, 13, 29))
+
+    # then
+    # an unknown entry is checked, then parsed by the default parser as a last resort
+    assert parsed == ['Shower; 14:00', '30m', 'Rome -> Milan', 'unknown', 'unknown', 'Shower']
+
+
+def test_toggle_online_parsers_switches_back_and_forth(standard_parser: StandardParser):
+    # given
+    standard_parser.__dict__['mapbox_parser'] = SlowRemoteParser(directions_only=True)
+    standard_parser.__dict__['open_ai_guess_parser'] = SlowRemoteParser()
+
+    # when
+    standard_parser.toggle_online_parsers()
+    online = list(standard_parser._additional_parsers)
+    standard_parser.toggle_online_parsers()
+
+    # then
+    assert len(online) == 3
+    assert standard_parser._additional_parsers == [standard_parser.default_parser]
+
+
+def test_parse_results_are_reused_across_schedules():
+    # given
+    parse_cache = ParseCache(maxsize=100)
+    usr_entries = ['Shower; 17:02', 'Clean', '25m', 'unknown']
+    usr_synonyms = [('Clean', 10), ('Shower', 20)]
+    first: Schedule = punctual(entries=usr_entries, usr_synonyms=usr_synonyms, parse_cache=parse_cache)
+    misses = parse_cache.misses
+
+    # when
+    second: Schedule = punctual(entries=usr_entries, usr_synonyms=usr_synonyms, parse_cache=parse_cache)
+
+    # then
+    assert str(second) == str(first)
+    assert parse_cache.misses == misses
+    assert parse_cache.hit_rate == 0.5
+
+
+def test_parse_cache_evicts_least_recently_used_results():
+    # given
+    parse_cache = ParseCache(maxsize=2)
+    parse_cache.put('a', 1)
+    parse_cache.put('b', 2)
+    parse_cache.get('a')
+
+    # when
+    parse_cache.put('c', 3)
+
+    # then
+    assert 'a' in parse_cache
+    assert 'b' not in parse_cache
+    assert len(parse_cache) == 2
+
+
+def test_next_boundary_is_the_next_start_or_end_of_an_entry():
+    # given
+    start = datetime(2024, 5, 31, 8)
+    schedule: Schedule = Schedule()
+    schedule.append('Breakfast', timedelta(minutes=10), start)
+    schedule.append('Shower', timedelta(minutes=20), start + timedelta(minutes=15))
+
+    # when / then
+    assert schedule.next_boundary(start - timedelta(minutes=1)) == start
+    assert schedule.next_boundary(start) == start + timedelta(minutes=10)
+    assert schedule.next_boundary(start + timedelta(minutes=12)) == start + timedelta(minutes=15)
+    assert schedule.next_boundary(start + timedelta(minutes=35)) is None
+
+
+def test_update_reparses_and_retimes_only_changed_entries(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 31, 8)))
+    parser = StandardParser(synonyms=[('Shower', 20), ('Clean', 10)], contingency=timedelta(minutes=2))
+    entries = ['Shower', '# morning', 'Clean', '25m', 'Lunch 30m; 12:00', '15m', 'Clean']
+    schedule: Schedule = Schedule.from_entries(*entries, parser=parser)
+    parsed = []
+    monkeypatch.setattr(parser, 'parse', lambda entry, **kwargs: parsed.append(entry) or
+                        StandardParser.parse(parser, entry, **kwargs))
+
+    # when
+    edited = ['Shower', '# morning', '40m', '25m', 'Lunch 30m; 12:00', 'Clean', '15m']
+    schedule.update(*edited, parser=parser)
+
+    # then
+    assert parsed == ['40m', 'Clean']
+    assert str(schedule) == str(Schedule.from_entries(*edited, parser=parser))
+    assert schedule.minutes == 22 + 42 + 27 + 32 + 12 + 17
+
+
+def test_update_removing_the_first_entry_starts_the_next_one_right_now(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 31, 8)))
+    parser = StandardParser(synonyms=[], contingency=timedelta(minutes=2))
+    schedule: Schedule = Schedule.from_entries('10m', '20m', '30m', parser=parser)
+
+    # when
+    schedule.update('20m', '30m', '5m', parser=parser)
+
+    # then
+    assert str(schedule) == str(Schedule.from_entries('20m', '30m', '5m', parser=parser))
+    assert schedule.start == datetime(2024, 5, 31, 8)
+
+
+def test_update_inserting_a_fixed_entry_retimes_the_following_ones(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 31, 8)))
+    parser = StandardParser(synonyms=[('Shower', 20)], contingency=timedelta(minutes=2))
+    schedule: Schedule = Schedule.from_entries('Shower', '1h', parser=parser)
+
+    # when
+    schedule.update('30m; 10:30', 'Shower', '1h', parser=parser)
+
+    # then
+    assert schedule._entries == Schedule.from_entries('30m; 10:30', 'Shower', '1h', parser=parser)._entries
+
+
+def test_update_makes_the_same_schedule_as_from_entries(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 31, 8)))
+    parser = StandardParser(synonyms=[('Shower', 20), ('Clean', 10)], contingency=timedelta(minutes=2))
+    pool = ['Shower', 'Clean', '25m', '15m', '1h', '30m; 10:30', 'Lunch 30m; 12:00', 'Clean; 7:00', '45m; 9:00']
+    rng = random.Random(42)
+    entries = [rng.choice(pool) for _ in range(6)]
+    schedule: Schedule = Schedule.from_entries(*entries, parser=parser)
+
+    for _ in range(200):
+        # when
+        edited = list(entries)
+        for _ in range(rng.randint(1, 3)):
+            position = rng.randint(0, len(edited))
+            edit = rng.choice(['insert', 'remove', 'replace']) if edited else 'insert'
+            if edit == 'insert':
+                edited.insert(position, rng.choice(pool))
+            elif edit == 'remove':
+                edited.pop(min(position, len(edited) - 1))
+            else:
+                edited[min(position, len(edited) - 1)] = rng.choice(pool)
+        schedule.update(*edited, parser=parser)
+
+        # then
+        assert schedule._entries == Schedule.from_entries(*edited, parser=parser)._entries
+        assert schedule.minutes == pytest.approx(sum(e.minutes for e in schedule._entries))
+        entries = edited
+
+
+def test_stream_yields_the_entries_of_from_entries_chunk_by_chunk(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 31, 8)))
+    parser = StandardParser(synonyms=[('Shower', 20), ('Clean', 10)], contingency=timedelta(minutes=2))
+    entries = ['Shower', '# morning', 'Clean', 'Lunch 30m; 12:00', '25m', 'Clean; 7:00', '15m']
+    prefetched = []
+    monkeypatch.setattr(parser, 'prefetch', lambda chunk: prefetched.append(chunk))
+
+    # when
+    streamed = list(Schedule.stream(iter(entries), parser=parser, chunk_size=4))
+
+    # then
+    assert prefetched == [['Shower', 'Clean', 'Lunch 30m; 12:00', '25m'], ['Clean; 7:00', '15m']]
+    assert sorted(streamed, key=lambda e: e.start_time) == \
+        Schedule.from_entries(*entries, parser=parser)._entries
+
+
+def test_profile_is_shared_and_read_again_only_when_changed(tmp_path):
+    # given
+    profile_file = tmp_path / 'profile.json'
+    profile_file.write_text('{"mapbox": {"token": "first"}, "openai": {"token": "first"}}')
+    first = load_profile(str(profile_file))
+
+    # when
+    unchanged = load_profile(str(profile_file))
+    profile_file.write_text('{"mapbox": {"token": "second"}, "openai": {"token": "second"}}')
+    stat = profile_file.stat()
+    os.utime(profile_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    changed = load_profile(str(profile_file))
+
+    # then
+    assert unchanged is first
+    assert changed.mapbox_token == 'second'
+
+
+def test_offline_entries_never_touch_online_parsers_nor_credentials(monkeypatch):
+    # given
+    monkeypatch.delenv('PUNCTUAL_PROFILE', raising=False)
+    parser = StandardParser(synonyms=[('Shower', 20)], contingency=timedelta(minutes=2))
+
+    # when
+    parser.toggle_online_parsers()
+    schedule: Schedule = Schedule.from_entries('Shower', '25m', '# Lunch', parser=parser)
+
+    # then
+    assert len(schedule) == 2
+    assert '_cache' not in vars(parser.mapbox_parser)
+    assert '_cache' not in vars(parser.open_ai_guess_parser)
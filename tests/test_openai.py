@@ -0,0 +1,131 @@
+import os
+import pytest
+
+from json import dumps
+from json import loads
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+from punctual._cache import PersistentCache
+from punctual._openai import GuessCache
+from punctual._openai import MAX_TOKENS
+from punctual._openai import REQUEST_OPTIONS
+from punctual._openai import guess_duration
+from punctual._openai import guess_durations
+from punctual.new_core import OpenAIGuessParser
+
+
+class StubClient:
+    # answers as the AI would, guessing 10 minutes per word
+    def __init__(self):
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        entries = loads(kwargs['messages'][-1]['content'][0]['text'])
+        content = dumps({'durations': {entry: 10 * len(entry.split()) for entry in entries}})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+# FIXTURES
+
+@pytest.fixture
+def guess_cache(tmp_path) -> GuessCache:
+    return GuessCache(PersistentCache('openai', directory=str(tmp_path)), similarity=0.6)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('No remote call was expected')
+    monkeypatch.setattr('punctual._openai.client', fail)
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    monkeypatch.setenv('PUNCTUAL_PROFILE', os.path.join(os.path.dirname(__file__), '..', 'example', 'profile.json'))
+
+
+# TEST METHODS
+
+
+def test_guesses_are_shared_by_entries_with_the_same_words(guess_cache: GuessCache, offline):
+    # given
+    guess_cache.set('Cleaning kitchen', timedelta(minutes=15))
+
+    # when
+    result = guess_duration('cleaning the Kitchen', 'token', guess_cache)
+
+    # then
+    assert result == timedelta(minutes=15)
+    assert guess_cache.hits == 1
+
+
+def test_guesses_match_similar_entries(guess_cache: GuessCache):
+    # given
+    guess_cache.set('Cleaning the kitchen floor', timedelta(minutes=25))
+
+    # when
+    similar = guess_cache.get('cleaning kitchen floor quickly')
+    different = guess_cache.get('walking the dog')
+
+    # then
+    assert similar == timedelta(minutes=25)
+    assert different is None
+    assert guess_cache.hit_rate == 0.5
+
+
+def test_similar_entries_are_looked_up_among_guesses_sharing_words(tmp_path):
+    # given
+    persistent_cache = PersistentCache('openai', directory=str(tmp_path))
+    GuessCache(persistent_cache).set('Cleaning the kitchen floor', timedelta(minutes=25))
+    guess_cache = GuessCache(persistent_cache, similarity=0.6)
+
+    # when
+    earlier = guess_cache.get('cleaning kitchen floor quickly')
+    guess_cache.set('Walking the dog', timedelta(minutes=30))
+    later = guess_cache.get('walking the dog quickly')
+
+    # then
+    assert earlier == timedelta(minutes=25)
+    assert later == timedelta(minutes=30)
+    assert guess_cache._keys_by_word['kitchen'] == {GuessCache.key('Cleaning the kitchen floor')}
+    assert guess_cache._keys_by_word['dog'] == {GuessCache.key('Walking the dog')}
+
+
+def test_all_durations_are_guessed_with_one_request(guess_cache: GuessCache):
+    # given
+    stub = StubClient()
+    guess_cache.set('Walking the dog', timedelta(minutes=30))
+
+    # when
+    result = guess_durations(['Having lunch', 'walking dog', 'Reading a book aloud', 'Having lunch'],
+                             'token', guess_cache, stub)
+
+    # then
+    assert result == {'Having lunch': timedelta(minutes=20),
+                      'walking dog': timedelta(minutes=30),
+                      'Reading a book aloud': timedelta(minutes=40)}
+    assert len(stub.requests) == 1
+    assert loads(stub.requests[0]['messages'][-1]['content'][0]['text']) == ['Having lunch', 'Reading a book aloud']
+    assert {key: stub.requests[0][key] for key in REQUEST_OPTIONS} == REQUEST_OPTIONS
+    assert stub.requests[0]['max_tokens'] == MAX_TOKENS + 32 * 2
+    assert 'Get dressed: 15 minutes' in stub.requests[0]['messages'][0]['content'][0]['text']
+
+
+def test_openai_parser_guesses_prefetched_entries_without_further_requests(profile, tmp_path):
+    # given
+    stub = StubClient()
+    parser = OpenAIGuessParser(cache_dir=str(tmp_path), openai_client=stub)
+    entries = ['Having lunch', 'Reading a book; 15:00']
+
+    # when
+    parser.prefetch(entries)
+    result = [parser.parse(entry, start_time=datetime(2024, 5, 23, 13, 29)) for entry in entries]
+
+    # then
+    assert result == [('Having lunch', timedelta(minutes=20), None),
+                      ('Reading a book', timedelta(minutes=30), datetime(2024, 5, 23, 15, 0))]
+    assert len(stub.requests) == 1
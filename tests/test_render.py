@@ -0,0 +1,63 @@
+import pytest
+
+from datetime import datetime
+from datetime import timedelta
+
+from punctual.core import prettify_report
+from punctual.new_core import Schedule
+from punctual._render import is_supported
+
+
+# FIXTURES
+
+def make_schedule(tablefmt: str, *names: str) -> Schedule:
+    schedule: Schedule = Schedule(tablefmt=tablefmt)
+    start = datetime(2024, 5, 31, 8)
+    for i, name in enumerate(names):
+        schedule.append(name, timedelta(minutes=20 * i + 5), start + timedelta(hours=i) if i % 2 else None)
+    return schedule
+
+
+# TEST METHODS
+
+
+@pytest.mark.parametrize('tablefmt', [None, 'default', 'simple', 'plain', 'github', 'grid', 'simple_grid',
+                                      'rounded_grid', 'fancy_grid', 'psql', 'presto', 'orgtbl', 'outline'])
+def test_reports_are_rendered_exactly_as_tabulate_would(tablefmt):
+    # given
+    schedule: Schedule = make_schedule(tablefmt, 'Shower', 'Lunch with friends', 'Clean', '25m', ' Snack ')
+
+    # when
+    report = str(schedule)
+
+    # then
+    assert report == prettify_report(schedule.__dict__(), tablefmt=tablefmt)
+
+
+def test_multiline_names_are_rendered_exactly_as_tabulate_would():
+    # given
+    schedule: Schedule = make_schedule('simple_grid', 'Colosseo, Roma\nPiazza della Repubblica, Roma', 'Shower')
+
+    # when
+    lines = list(schedule.lines())
+
+    # then
+    assert '\n'.join(lines) == prettify_report(schedule.__dict__(), tablefmt='simple_grid')
+
+
+def test_tables_the_renderer_cannot_reproduce_are_left_to_tabulate():
+    # given
+    schedule: Schedule = make_schedule('rst', 'Shower', 'Caffè')
+
+    # when / then
+    assert not is_supported(['Shower', 'Caffè'], 'simple')
+    assert not is_supported(['1', '2.5'], 'simple')
+    assert not is_supported(['1,000'], 'simple')
+    assert not is_supported(['True', 'nan'], 'simple')
+    assert not is_supported(['False', '', '-1,000.5'], 'simple')
+    assert is_supported(['1e23456', 'true', '1,0000'], 'simple')
+    assert not is_supported(['Shower'], 'rst')
+    assert str(schedule) == prettify_report(schedule.__dict__(), tablefmt='rst')
+    for names in [('1,000',), ('True', 'nan'), ('1e23456', 'true', '1,0000')]:
+        schedule = make_schedule('simple', *names)
+        assert str(schedule) == prettify_report(schedule.__dict__(), tablefmt='simple')
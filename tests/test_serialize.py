@@ -0,0 +1,85 @@
+import io
+import pytest
+
+from datetime import datetime
+from datetime import timedelta
+
+from punctual.new_core import Schedule
+from punctual.new_core import StandardParser
+from punctual._serialize import dump_jsonl
+from punctual._serialize import load_csv
+from punctual._serialize import load_jsonl
+from punctual._serialize import load_npz
+
+
+# FIXTURES
+
+@pytest.fixture
+def schedule() -> Schedule:
+    result: Schedule = Schedule(tablefmt='simple_grid')
+    start = datetime(2024, 5, 31, 8, 0, 0, 123456)
+    result.append('Colosseo, Roma\nPiazza "della" Repubblica, Roma', timedelta(minutes=20, microseconds=7), start)
+    result.append('Caffè, with a comma', timedelta(minutes=5))
+    result.append('Lunch', timedelta(minutes=30), datetime(2024, 5, 31, 8, 10))
+    result.append('', timedelta(0))
+    return result
+
+
+# TEST METHODS
+
+
+def test_jsonl_round_trip(schedule: Schedule):
+    # given
+    file = io.StringIO()
+
+    # when
+    schedule.to_jsonl(file)
+    file.seek(0)
+    loaded: Schedule = load_jsonl(file, tablefmt='simple_grid')
+
+    # then
+    assert len(file.getvalue().splitlines()) == 4
+    assert loaded._entries == schedule._entries
+    assert str(loaded) == str(schedule)
+
+
+def test_csv_round_trip(schedule: Schedule):
+    # given
+    file = io.StringIO(newline='')
+
+    # when
+    schedule.to_csv(file)
+    file.seek(0)
+    loaded: Schedule = load_csv(file)
+
+    # then
+    assert loaded._entries == schedule._entries
+    assert loaded.minutes == schedule.minutes
+
+
+def test_npz_round_trip(schedule: Schedule, tmp_path):
+    # given
+    file = str(tmp_path / 'schedule.npz')
+
+    # when
+    schedule.to_npz(file)
+    loaded: Schedule = load_npz(file)
+
+    # then
+    assert loaded._entries == schedule._entries
+    assert loaded.minutes == schedule.minutes
+
+
+def test_streamed_entries_are_dumped_as_they_come(monkeypatch):
+    # given
+    monkeypatch.setattr(Schedule, '_now', classmethod(lambda cls: datetime(2024, 5, 31, 8)))
+    parser = StandardParser(synonyms=[('Shower', 20)], contingency=timedelta(minutes=2))
+    entries = ['Shower', 'Lunch 30m; 12:00', '25m', 'Snack 5m; 7:00']
+    file = io.StringIO()
+
+    # when
+    dump_jsonl(Schedule.stream(iter(entries), parser=parser), file)
+    file.seek(0)
+
+    # then
+    assert load_jsonl(file)._entries == Schedule.from_entries(*entries, parser=parser)._entries
@@ -0,0 +1,65 @@
+from datetime import datetime
+from datetime import timedelta
+
+from punctual._synonyms import SynonymIndex
+from punctual.core import add_synonym_duration
+from punctual.core import tokenize_entry
+from punctual.new_core import StandardParser
+
+
+# TEST METHODS
+
+
+def test_synonyms_are_found_exactly_by_prefix_and_approximately():
+    # given
+    synonyms = SynonymIndex()
+    for synonym, minutes in [('Shower', 20), ('Getting ready to go out', 15), ('Getting dressed', 10),
+                             ('Rome -> Paris', 120)]:
+        add_synonym_duration(synonym, synonyms, minutes)
+
+    # when / then
+    assert synonyms.duration(tokenize_entry('shower')) == 20
+    assert synonyms.duration(tokenize_entry('Paris -> Rome')) == 120
+    assert synonyms.duration(tokenize_entry('Getting ready')) == 15
+    assert synonyms.duration(tokenize_entry('Showers')) == 20
+    # "getting" is the beginning of two synonyms, and similar to none of them
+    assert synonyms.duration(tokenize_entry('Getting')) == 0
+    assert synonyms.duration(tokenize_entry('unknown')) == 0
+
+
+def test_synonyms_are_not_found_by_a_few_letters_nor_part_of_a_word():
+    # given
+    synonyms = SynonymIndex()
+    for synonym, minutes in [('Shower', 20), ('Grocery', 25), ('Home -> Movie theater', 80)]:
+        add_synonym_duration(synonym, synonyms, minutes)
+
+    # when / then
+    assert synonyms.duration(tokenize_entry('S')) == 0
+    assert synonyms.duration(tokenize_entry('G')) == 0
+    assert synonyms.duration(tokenize_entry('Gro')) == 0
+    assert synonyms.duration(tokenize_entry('Home -> M')) == 0
+    assert synonyms.duration(tokenize_entry('Movie theater -> Home')) == 80
+
+
+def test_trips_match_synonyms_exactly():
+    # given
+    synonyms = SynonymIndex()
+    for synonym, minutes in [('Home -> Rome', 61), ('Home -> Movie theater', 80)]:
+        add_synonym_duration(synonym, synonyms, minutes)
+
+    # when / then
+    assert synonyms.duration(tokenize_entry('Rome -> Home')) == 61
+    assert synonyms.duration(tokenize_entry('Home -> Romania')) == 0
+    assert synonyms.duration(tokenize_entry('Home -> Movie')) == 0
+
+
+def test_standard_parser_resolves_near_miss_entries_locally():
+    # given
+    parser = StandardParser(synonyms=[('Shower', 20), ('Breakfast', 10)], contingency=timedelta(minutes=3))
+
+    # when
+    parsed = parser.try_parse('Showers', start_time=datetime(2024, 1, 1, 8))
+
+    # then
+    assert parsed == ('Showers', timedelta(minutes=23), None)
+    assert parser.try_parse('breakfasts', start_time=datetime(2024, 1, 1, 8))[1] == timedelta(minutes=13)